@@ -4,18 +4,21 @@ Handles registration, login, logout, session helpers, and password hashing.
 """
 
 import streamlit as st
-import bcrypt
 import re
-from database.db import create_user, get_user_by_username, get_user_by_email
+from auth.passwords import hash_password, hash_password_async, needs_rehash, verify_password
+from database.db import create_user, get_user_by_username, get_user_by_email, replace_password_hash
+from telemetry.tracing import traced
 
 
 # ─── Password helpers ───────────────────────────────────────────────────────────
-def hash_password(plain: str) -> str:
-    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt()).decode()
+@traced("auth.upgrade_password_hash")
+def _upgrade_password_hash(user_id: int, plain: str, old_hash: str):
+    """Re-hash at the current work factor without delaying the login."""
+    def store(future):
+        if future.exception() is None:
+            replace_password_hash(user_id, old_hash, future.result())
 
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return bcrypt.checkpw(plain.encode(), hashed.encode())
+    hash_password_async(plain).add_done_callback(store)
 
 
 # ─── Validation helpers ─────────────────────────────────────────────────────────
@@ -54,40 +57,9 @@ def logout():
 
 
 # ─── UI Components ──────────────────────────────────────────────────────────────
+@traced("view.login")
 def render_login_page():
     """Render the login form."""
-    st.markdown("""
-    <style>
-    .auth-container {
-        max-width: 440px;
-        margin: 2rem auto;
-        padding: 2.5rem 2rem;
-        border-radius: 16px;
-        background: linear-gradient(135deg, #ffffff 0%, #f8fafc 100%);
-        box-shadow: 0 4px 24px rgba(0,0,0,0.08);
-    }
-    .auth-title {
-        text-align: center;
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: #1e293b;
-        margin-bottom: 0.25rem;
-    }
-    .auth-subtitle {
-        text-align: center;
-        color: #64748b;
-        margin-bottom: 1.5rem;
-        font-size: 0.95rem;
-    }
-    .auth-divider {
-        text-align: center;
-        color: #94a3b8;
-        font-size: 0.85rem;
-        margin: 1rem 0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         st.markdown('<p class="auth-title">👋 Welcome Back</p>', unsafe_allow_html=True)
@@ -111,6 +83,8 @@ def render_login_page():
                 if not verify_password(password, user["password"]):
                     st.error("Invalid username or password.")
                     return
+                if needs_rehash(user["password"]):
+                    _upgrade_password_hash(user["id"], password, user["password"])
 
                 # Success – set session
                 st.session_state["authenticated"] = True
@@ -127,34 +101,9 @@ def render_login_page():
             st.rerun()
 
 
+@traced("view.register")
 def render_register_page():
     """Render the registration form."""
-    st.markdown("""
-    <style>
-    .auth-container {
-        max-width: 440px;
-        margin: 2rem auto;
-        padding: 2.5rem 2rem;
-        border-radius: 16px;
-        background: linear-gradient(135deg, #ffffff 0%, #f8fafc 100%);
-        box-shadow: 0 4px 24px rgba(0,0,0,0.08);
-    }
-    .auth-title {
-        text-align: center;
-        font-size: 1.8rem;
-        font-weight: 700;
-        color: #1e293b;
-        margin-bottom: 0.25rem;
-    }
-    .auth-subtitle {
-        text-align: center;
-        color: #64748b;
-        margin-bottom: 1.5rem;
-        font-size: 0.95rem;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         st.markdown('<p class="auth-title">🚀 Create Account</p>', unsafe_allow_html=True)
@@ -0,0 +1,78 @@
+"""
+SmartScribe – Password hashing
+bcrypt hashing and verification on a bounded thread pool. bcrypt releases the
+GIL, so the pool hashes on several cores at once while capping how many
+CPU-bound hashes run concurrently during a login storm.
+"""
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import bcrypt
+
+from telemetry.tracing import traced
+
+# Work factor for new hashes; each +1 doubles the cost of a login.
+BCRYPT_ROUNDS = int(os.environ.get("SMARTSCRIBE_BCRYPT_ROUNDS", "12"))
+# Concurrent hashes per process – defaults to one per core.
+HASH_WORKERS = int(os.environ.get("SMARTSCRIBE_HASH_WORKERS", "0")) or os.cpu_count() or 2
+
+_pool_lock = threading.Lock()
+_pool = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+        return _pool
+
+
+def configure(rounds: int = None, workers: int = None):
+    """Change the work factor and/or pool size (e.g. from a benchmark)."""
+    global BCRYPT_ROUNDS, HASH_WORKERS, _pool
+    if rounds is not None:
+        BCRYPT_ROUNDS = rounds
+    if workers is not None:
+        with _pool_lock:
+            HASH_WORKERS = workers
+            if _pool is not None:
+                _pool.shutdown(wait=True)
+                _pool = None
+
+
+def _hash(plain: str, rounds: int) -> str:
+    return bcrypt.hashpw(plain.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _verify(plain: str, hashed: str) -> bool:
+    return bcrypt.checkpw(plain.encode(), hashed.encode())
+
+
+def hash_password_async(plain: str, rounds: int = None) -> Future:
+    return _executor().submit(_hash, plain, rounds or BCRYPT_ROUNDS)
+
+
+@traced("auth.hash_password")
+def hash_password(plain: str, rounds: int = None) -> str:
+    return hash_password_async(plain, rounds).result()
+
+
+@traced("auth.verify_password")
+def verify_password(plain: str, hashed: str) -> bool:
+    return _executor().submit(_verify, plain, hashed).result()
+
+
+def hash_cost(hashed: str) -> int:
+    """Work factor of a stored hash (``$2b$12$…`` → 12)."""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+def needs_rehash(hashed: str) -> bool:
+    """True when a stored hash is cheaper than the configured work factor."""
+    return hash_cost(hashed) < BCRYPT_ROUNDS
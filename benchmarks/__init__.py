@@ -0,0 +1,4 @@
+"""
+SmartScribe – Benchmarks
+Stand-alone performance harnesses; run each with ``python -m benchmarks.<name>``.
+"""
@@ -0,0 +1,78 @@
+"""
+SmartScribe – Login throughput by bcrypt work factor
+Run with:  python -m benchmarks.bcrypt_cost [--costs 10 11 12 13] [--sessions 16] [--json]
+
+Simulates a login storm: `--sessions` threads each verify a password through
+the shared hashing pool. Reports logins/sec and latency per work factor so a
+server can be sized for the configured SMARTSCRIBE_BCRYPT_ROUNDS.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+
+from auth import passwords
+
+
+def run_cost(cost: int, sessions: int, logins: int, workers: int) -> dict:
+    passwords.configure(workers=workers)
+    stored = passwords.hash_password("correct horse battery staple", rounds=cost)
+    latencies = []
+    lock = threading.Lock()
+    per_session = max(1, logins // sessions)
+
+    def session():
+        for _ in range(per_session):
+            t0 = time.perf_counter()
+            passwords.verify_password("correct horse battery staple", stored)
+            with lock:
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "cost": cost,
+        "workers": workers,
+        "sessions": sessions,
+        "logins": len(latencies),
+        "logins_per_sec": round(len(latencies) / elapsed, 2),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 1),
+            "p50": round(latencies[len(latencies) // 2], 1),
+            "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure logins/sec at each bcrypt work factor.")
+    parser.add_argument("--costs", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--sessions", type=int, default=16, help="concurrent logging-in sessions")
+    parser.add_argument("--logins", type=int, default=64, help="total logins per cost")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="hashing pool size")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    results = [run_cost(c, args.sessions, args.logins, args.workers) for c in args.costs]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'cost':>4}  {'logins/s':>9}  {'mean ms':>8}  {'p50 ms':>7}  {'p95 ms':>7}   "
+          f"({args.sessions} sessions, {args.workers} hash workers)")
+    for r in results:
+        lat = r["latency_ms"]
+        print(f"{r['cost']:>4}  {r['logins_per_sec']:>9}  {lat['mean']:>8}  {lat['p50']:>7}  {lat['p95']:>7}")
+
+
+if __name__ == "__main__":
+    main()
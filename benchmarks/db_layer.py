@@ -0,0 +1,278 @@
+"""
+SmartScribe – Database layer benchmark
+Run with:  python -m benchmarks.db_layer [--users 1000] [--essays 20000] [--threads 8]
+                                         [--iterations 200] [--json] [--out run.json] [--compare base.json]
+
+Seeds a throwaway database with synthetic users and essays, then times each
+`database.db` entry point single-threaded and from `--threads` concurrent
+threads, reporting p50/p95/p99 latency and throughput. The --json output of
+two runs can be diffed with --compare to spot regressions.
+
+Seeding is deterministic for a given --seed, --users and --words, and
+resumable: point --db at an existing benchmark file and only the missing
+users/essays are added. It goes through save_essays_bulk, so triggers,
+search and similarity indexing are paid for exactly as in production –
+roughly 500 essays/s per core, which makes 10M essays an overnight job best
+seeded once and reused.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.synthetic import make_essay, make_title
+
+SEED_BATCH = 2000
+SEED_FEEDBACK = "- **Grammar** – Looks clean."     # tells seeded essays from ones the write benchmarks add
+HISTORY_DAYS = 730          # submissions are spread over the last two years
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _summary(latencies, elapsed: float) -> dict:
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+        },
+    }
+
+
+# ─── Synthetic data ─────────────────────────────────────────────────────────────
+def _user_weights(users: int, seed_value: int) -> list:
+    """Cumulative Pareto weights – a few prolific users and a long tail."""
+    rng = random.Random(seed_value)
+    return list(itertools.accumulate(min(rng.paretovariate(1.5), 50.0) for _ in range(users)))
+
+
+def seed(db, users: int, essays: int, words: int, seed_value: int, log=print) -> dict:
+    """Top the database up to `users` users and `essays` essays."""
+    from auth.passwords import hash_password
+
+    with db.connection() as conn:
+        have_users = conn.execute("SELECT COUNT(*) FROM users WHERE username GLOB 'bench[0-9]*'").fetchone()[0]
+        have_essays = conn.execute("SELECT COUNT(*) FROM essays WHERE feedback = ?", (SEED_FEEDBACK,)).fetchone()[0]
+
+    if have_users < users:
+        stored = hash_password("benchmark", rounds=4)       # one hash; cost is irrelevant here
+        with db.transaction(immediate=True) as conn:
+            conn.executemany(
+                "INSERT INTO users (username, email, password, full_name) VALUES (?, ?, ?, ?)",
+                [(f"bench{i}", f"bench{i}@example.com", stored, f"Bench User {i}")
+                 for i in range(have_users, users)],
+            )
+        log(f"seeded {users - have_users} users")
+
+    with db.connection() as conn:
+        user_ids = [r[0] for r in conn.execute(
+            "SELECT id FROM users WHERE username GLOB 'bench[0-9]*' ORDER BY CAST(substr(username, 6) AS INTEGER)"
+        )][:users]
+    weights = _user_weights(users, seed_value)
+
+    started = time.perf_counter()
+    for start in range(have_essays - have_essays % SEED_BATCH, essays, SEED_BATCH):
+        rng = random.Random(f"{seed_value}:{start}")
+        stop = min(start + SEED_BATCH, essays)
+        rows, ages = [], []
+        for n in range(start, stop):
+            scores = [round(rng.uniform(3, 9.5), 1) for _ in range(3)]
+            owner = rng.choices(user_ids, cum_weights=weights)[0]
+            row = (owner, make_title(rng), make_essay(rng, words), *scores,
+                   round(sum(scores) / 3, 1), SEED_FEEDBACK)
+            age = rng.randrange(HISTORY_DAYS * 1440)       # minutes before now
+            if n >= have_essays:                # replay the batch's RNG so resumed runs match
+                rows.append(row)
+                ages.append(age)
+        if not rows:
+            continue
+        with db.transaction(immediate=True) as conn:
+            db.save_essays_bulk(rows)
+            last = conn.execute("SELECT MAX(id) FROM essays").fetchone()[0]
+            conn.executemany(
+                "UPDATE essays SET submitted_at = datetime('now', ?) WHERE id = ?",
+                [(f"-{age} minutes", essay_id) for essay_id, age in zip(range(last - len(rows) + 1, last + 1), ages)],
+            )
+        done = stop - have_essays
+        rate = done / (time.perf_counter() - started)
+        log(f"seeded {stop:,}/{essays:,} essays ({rate:,.0f}/s)")
+
+    with db.connection() as conn:
+        conn.execute("PRAGMA optimize")
+    return {"users": users, "essays": essays}
+
+
+# ─── Operations ─────────────────────────────────────────────────────────────────
+def operations(db, users: int, words: int, seed_value: int) -> dict:
+    """name -> (kind, callable(rng)) for every benchmarked entry point."""
+    pool = [make_essay(random.Random(seed_value + i), words) for i in range(64)]
+    queries = ["technology", "climate change", "stud", "evidence policy", "homework"]
+    user = lambda rng: rng.randint(1, users)                # noqa: E731
+    with db.connection() as conn:
+        max_essay = conn.execute("SELECT MAX(id) FROM essays").fetchone()[0] or 1
+    counter = itertools.count()
+
+    def create_user(rng):
+        n = next(counter)
+        return db.create_user(f"bench-new-{seed_value}-{os.getpid()}-{n}", f"new{n}-{os.getpid()}@example.com", "x")
+
+    return {
+        "get_user_by_username": ("read", lambda rng: db.get_user_by_username(f"bench{rng.randrange(users)}")),
+        "get_user_by_id":       ("read", lambda rng: db.get_user_by_id(user(rng))),
+        "get_user_essays":      ("read", lambda rng: db.get_user_essays(user(rng))),
+        "list_user_essays":     ("read", lambda rng: db.list_user_essays(user(rng), limit=20)),
+        "get_essay_count":      ("read", lambda rng: db.get_essay_count(user(rng))),
+        "get_average_scores":   ("read", lambda rng: db.get_average_scores(user(rng))),
+        "get_dashboard_snapshot": ("read", lambda rng: db.get_dashboard_snapshot(user(rng), recent=20)),
+        "get_essay_content":    ("read", lambda rng: db.get_essay_content(rng.randint(1, max_essay))),
+        "get_score_series":     ("read", lambda rng: db.get_score_series(user(rng), "week")),
+        "search_essays":        ("read", lambda rng: db.search_essays(user(rng), rng.choice(queries))),
+        "find_similar_essays":  ("read", lambda rng: db.find_similar_essays(rng.choice(pool))),
+        "save_essay":           ("write", lambda rng: db.save_essay(
+            user(rng), make_title(rng), rng.choice(pool), 6.0, 6.5, 7.0, 6.5, "- **Grammar** – ok")),
+        "create_user":          ("write", create_user),
+        "enqueue_evaluation":   ("write", lambda rng: db.enqueue_evaluation(user(rng), make_title(rng), rng.choice(pool))),
+        "update_user":          ("write", lambda rng: db.update_user(user(rng), full_name=f"Renamed {rng.random():.6f}")),
+    }
+
+
+def _run(fn, calls: int, threads: int, seed_value: int, cold: bool) -> dict:
+    from database import cache as read_cache
+
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(index: int, n: int):
+        rng = random.Random(f"{seed_value}:{index}")
+        local = []
+        for _ in range(n):
+            if cold:
+                read_cache.clear()
+            t0 = time.perf_counter()
+            fn(rng)
+            local.append((time.perf_counter() - t0) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    share = [calls // threads + (1 if i < calls % threads else 0) for i in range(threads)]
+    pool = [threading.Thread(target=worker, args=(i, n)) for i, n in enumerate(share)]
+    started = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return _summary(latencies, time.perf_counter() - started)
+
+
+def run(args) -> dict:
+    from database import db, querylog
+
+    if args.slow_ms is not None:
+        querylog.configure(args.slow_ms)        # before the first connection is opened
+    db.DB_PATH = os.environ["SMARTSCRIBE_DB_PATH"] = args.db
+    db.GROUP_COMMIT = not args.no_group_commit
+    db.init_db()
+    log = (lambda msg: print(msg, file=sys.stderr)) if args.json else print
+    seed(db, args.users, args.essays, args.words, args.seed, log=log)
+    querylog.reset()                                # report on the benchmarked calls only
+
+    ops = operations(db, args.users, args.words, args.seed)
+    selected = args.only or list(ops)
+    results = []
+    for name in selected:
+        kind, fn = ops[name]
+        for threads in sorted({1, args.threads}):
+            fn(random.Random(0))                            # warm the statement cache
+            entry = {"op": name, "kind": kind, "threads": threads}
+            entry.update(_run(fn, args.iterations, threads, args.seed, args.cold))
+            results.append(entry)
+            log(f"{name:<24} {threads:>2} thr  p50 {entry['latency_ms']['p50']:>8.3f}  "
+                f"p95 {entry['latency_ms']['p95']:>8.3f}  p99 {entry['latency_ms']['p99']:>8.3f} ms  "
+                f"{entry['ops_per_sec']:>9,.1f} ops/s")
+    return {
+        "meta": {
+            "users": args.users, "essays": args.essays, "words": args.words, "seed": args.seed,
+            "iterations": args.iterations, "threads": args.threads, "cold_cache": args.cold,
+            "group_commit": not args.no_group_commit,
+            "db_path": args.db, "db_bytes": os.path.getsize(args.db),
+            "sqlite": sqlite3.sqlite_version, "python": platform.python_version(),
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+        "query_shapes": querylog.top(args.top_queries) if querylog.ENABLED else [],
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Lines describing p95 changes beyond `tolerance` (a fraction) against `baseline`."""
+    before = {(r["op"], r["threads"]): r for r in baseline["results"]}
+    lines = []
+    for r in report["results"]:
+        old = before.get((r["op"], r["threads"]))
+        if not old:
+            continue
+        a, b = old["latency_ms"]["p95"], r["latency_ms"]["p95"]
+        change = (b - a) / a if a else 0.0
+        if abs(change) >= tolerance:
+            verdict = "slower" if change > 0 else "faster"
+            lines.append(f"{r['op']:<24} {r['threads']:>2} thr  p95 {a:.3f} → {b:.3f} ms  "
+                         f"({change:+.0%}, {verdict})")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark database.db entry points on synthetic data.")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--essays", type=int, default=20000)
+    parser.add_argument("--words", type=int, default=400, help="approximate words per essay")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="benchmark database to create or reuse (default: a temp file)")
+    parser.add_argument("--threads", type=int, default=8, help="concurrency for the threaded pass")
+    parser.add_argument("--iterations", type=int, default=200, help="calls per operation per pass")
+    parser.add_argument("--only", nargs="+", metavar="OP", help="benchmark just these operations")
+    parser.add_argument("--cold", action="store_true", help="clear the read cache before every call")
+    parser.add_argument("--no-group-commit", action="store_true", help="give every write its own transaction")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--out", help="also write the JSON report to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="report p95 changes against an earlier --out file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p95 change worth reporting (fraction)")
+    parser.add_argument("--slow-ms", type=float, help="log statements slower than this and report query shapes")
+    parser.add_argument("--top-queries", type=int, default=15, help="query shapes in that report")
+    args = parser.parse_args(argv)
+    if not args.db:
+        args.db = os.path.join(tempfile.mkdtemp(prefix="smartscribe-bench-"), "bench.db")
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    if report["query_shapes"]:
+        from database import querylog
+        print("\n" + querylog.format_report(args.top_queries), file=sys.stderr if args.json else sys.stdout)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            changes = compare(report, json.load(fh), args.tolerance)
+        out = sys.stderr if args.json else sys.stdout
+        print("\n".join(changes) or f"No p95 change beyond {args.tolerance:.0%}.", file=out)
+
+
+if __name__ == "__main__":
+    main()
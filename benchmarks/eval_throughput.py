@@ -0,0 +1,83 @@
+"""
+SmartScribe – Evaluation engine throughput benchmark
+Run with:  python -m benchmarks.eval_throughput [--essays 500] [--words 500] [--json]
+
+Reports essays/sec and per-essay latency for the default pipeline on one core
+and compares against TARGET_ESSAYS_PER_SEC; exits non-zero under --check.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import make_essay
+from evaluation import Pipeline
+
+# Single-core floor for ~500-word essays. The scorer is the request hot path,
+# so a change that drops below this needs a second look.
+TARGET_ESSAYS_PER_SEC = 150
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(essays: int = 500, words: int = 500, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    corpus = [make_essay(rng, words) for _ in range(essays)]
+    pipeline = Pipeline()
+    pipeline.evaluate(corpus[0])                # warm caches / imports
+
+    latencies = []
+    started = time.perf_counter()
+    for text in corpus:
+        t0 = time.perf_counter()
+        pipeline.evaluate(text)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+
+    total_words = sum(len(t.split()) for t in corpus)
+    return {
+        "essays": essays,
+        "avg_words": round(total_words / essays),
+        "essays_per_sec": round(essays / elapsed, 1),
+        "words_per_sec": round(total_words / elapsed),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 3),
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+        },
+        "target_essays_per_sec": TARGET_ESSAYS_PER_SEC,
+        "analyzers": [{"name": a.name, "cost": a.cost} for a in pipeline.analyzers],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the essay evaluation pipeline.")
+    parser.add_argument("--essays", type=int, default=500)
+    parser.add_argument("--words", type=int, default=500, help="approximate words per essay")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--check", action="store_true", help="exit 1 if below the throughput target")
+    args = parser.parse_args(argv)
+
+    result = run(args.essays, args.words, args.seed)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        lat = result["latency_ms"]
+        print(f"{result['essays']} essays × ~{result['avg_words']} words")
+        print(f"  throughput : {result['essays_per_sec']} essays/s ({result['words_per_sec']:,} words/s)")
+        print(f"  latency ms : mean {lat['mean']}  p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}")
+        print(f"  target     : {TARGET_ESSAYS_PER_SEC} essays/s")
+    if args.check and result["essays_per_sec"] < TARGET_ESSAYS_PER_SEC:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
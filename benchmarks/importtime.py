@@ -0,0 +1,111 @@
+"""
+SmartScribe – Import-time budget report
+Run with:  python -m benchmarks.importtime [--target app] [--repeat 5] [--top 15] [--json] [--check]
+
+Imports each target in a fresh interpreter under ``python -X importtime`` and
+aggregates the self time by top-level package, so a new dependency (or an eager
+import of a heavy one) shows up as a line in the report. Cold start of a new
+server replica is roughly the cost of importing `app`.
+
+Under --check, exits non-zero if a target exceeds --budget-ms or loads any of
+HEAVY_MODULES – those belong behind a lazy accessor.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only needed once an essay is scored; the landing page and login must not
+# import them. (plotly is not listed: Streamlit itself imports it.)
+HEAVY_MODULES = ("numpy", "evaluation.pipeline")
+
+DEFAULT_BUDGET_MS = 1500
+
+
+def _import_once(target: str, db_path: str) -> dict:
+    """One cold import; returns self time (µs) per module, in import order."""
+    env = dict(os.environ, SMARTSCRIBE_DB_PATH=db_path, SMARTSCRIBE_EXTERNAL_WORKER="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing {target} failed:\n{proc.stderr[-2000:]}")
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _cumulative, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def profile(target: str, repeat: int = 3) -> dict:
+    """Median per-package import time of `target` over `repeat` cold starts."""
+    per_package = defaultdict(list)
+    totals, loaded = [], set()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "importtime.db")
+        for _ in range(repeat):
+            modules = _import_once(target, db_path)
+            loaded.update(modules)
+            sums = defaultdict(int)
+            for name, self_us in modules.items():
+                sums[name.split(".", 1)[0]] += self_us
+            for package, self_us in sums.items():
+                per_package[package].append(self_us)
+            totals.append(sum(modules.values()))
+
+    packages = sorted(
+        ((p, statistics.median(v) / 1000) for p, v in per_package.items()),
+        key=lambda item: item[1], reverse=True,
+    )
+    return {
+        "target": target,
+        "repeat": repeat,
+        "total_ms": round(statistics.median(totals) / 1000, 1),
+        "modules": len(loaded),
+        "packages": [{"package": p, "ms": round(ms, 1)} for p, ms in packages],
+        "heavy_loaded": sorted(m for m in HEAVY_MODULES if m in loaded),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import time per package for cold starts.")
+    parser.add_argument("--target", nargs="+", default=["app"], help="modules to import (default: app)")
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts per target (median is reported)")
+    parser.add_argument("--top", type=int, default=15, help="packages to list per target")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--check", action="store_true", help="exit 1 if over budget or a heavy module loads")
+    args = parser.parse_args(argv)
+
+    reports = [profile(t, args.repeat) for t in args.target]
+    failed = [r for r in reports if r["total_ms"] > args.budget_ms or r["heavy_loaded"]]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        for r in reports:
+            print(f"import {r['target']}: {r['total_ms']} ms, {r['modules']} modules "
+                  f"(median of {r['repeat']}, budget {args.budget_ms:g} ms)")
+            for entry in r["packages"][:args.top]:
+                share = 100 * entry["ms"] / r["total_ms"] if r["total_ms"] else 0
+                print(f"  {entry['package']:<28} {entry['ms']:>8.1f} ms  {share:5.1f}%")
+            if r["heavy_loaded"]:
+                print(f"  heavy modules loaded eagerly: {', '.join(r['heavy_loaded'])}")
+            print()
+
+    if args.check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+SmartScribe – Concurrent-session load test
+Run with:  python -m benchmarks.load_test [--sessions 1 2 4 8] [--duration 20] [--think 1.0]
+                                          [--mix register=1,login=2,dashboard=3,profile=3,evaluate=1]
+                                          [--json] [--out load.json]
+
+Drives simulated users through app.py with streamlit's AppTest – no browser,
+no server – and times every interaction: wall time of the rerun it triggers,
+CPU spent, DB-layer calls and SQL statements. Each concurrency level runs that many
+sessions side by side for --duration seconds, so the report shows throughput
+and tail latency as sessions are added.
+
+Scenarios: register, login, dashboard (open an essay, hop to the profile and
+back), profile (change the chart grouping and range, search, load more) and
+evaluate (submit an essay, then poll until the background worker scores it).
+Profile tabs switch in the browser without a rerun, so the profile scenario
+exercises the widgets inside them instead.
+
+AppTest keeps its runtime in globals, so each session runs in its own process.
+A real server runs every session in one process, where Python work shares a
+core – the "1-proc ceiling" line estimates where that core saturates from
+the CPU each rerun costs. Polls are full reruns here but only re-run a
+fragment in the browser, so they are reported as their own step.
+"""
+
+import argparse
+import functools
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+PASSWORD = "loadtest-pw"
+DEFAULT_MIX = "register=1,login=2,dashboard=3,profile=3,evaluate=1"
+POLL_INTERVAL_S = 0.5           # the evaluate page's fragment polls this often
+POLL_TIMEOUT_S = 120
+SEARCH_TERMS = ["technology", "climate", "evidence", "stud", "policy makers"]
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+# ─── One simulated browser tab ──────────────────────────────────────────────────
+# Per process: calls into database.db entry points (cache hits included, nested
+# calls not), and statements SQLite ran – those triggers and FTS5 issue too.
+_counts = {"db_calls": 0, "sql": 0}
+_depth = threading.local()
+
+
+def _count_db_work():
+    """Instrument database.db; must run before the views import from it."""
+    from database import db
+
+    def counted(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            outer = not getattr(_depth, "n", 0)
+            _depth.n = getattr(_depth, "n", 0) + 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _depth.n -= 1
+                _counts["db_calls"] += outer
+        return wrapper
+
+    for name, fn in list(vars(db).items()):
+        if inspect.isfunction(fn) and fn.__module__ == db.__name__ and not name.startswith("_") \
+                and name not in ("connection", "transaction"):
+            setattr(db, name, counted(fn))
+
+    open_connection = db._open_connection
+
+    def traced():
+        conn = open_connection()
+        conn.set_trace_callback(lambda _sql: _counts.__setitem__("sql", _counts["sql"] + 1))
+        return conn
+
+    db._open_connection = traced
+
+
+class Session:
+    """An AppTest session that records a sample per interaction."""
+
+    def __init__(self, state: dict, think: float, rng: random.Random, samples: list):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(APP, default_timeout=POLL_TIMEOUT_S)
+        for key, value in state.items():
+            self.at.session_state[key] = value
+        self.think, self.rng, self.samples = think, rng, samples
+
+    def step(self, name: str, action=None):
+        """Apply `action` to the page (if any), rerun, and record the rerun."""
+        if self.samples and self.think:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.think)
+        if action is not None:
+            action(self.at)
+        calls, sql = _counts["db_calls"], _counts["sql"]
+        cpu, t0 = time.process_time(), time.perf_counter()
+        self.at.run()
+        wall = (time.perf_counter() - t0) * 1000
+        self.samples.append((name, wall, (time.process_time() - cpu) * 1000,
+                             _counts["db_calls"] - calls, _counts["sql"] - sql))
+        if self.at.exception:
+            raise RuntimeError(f"{name}: {self.at.exception[0].message}")
+
+    def state(self, key: str, default=None):
+        return self.at.session_state[key] if key in self.at.session_state else default
+
+    # Actions; the views' form fields have no keys, so they're found by label
+    @staticmethod
+    def submit(form: str, values: dict):
+        def action(at):
+            for widget in itertools.chain(at.text_input, at.text_area):
+                if widget.label in values:
+                    widget.input(values[widget.label])
+            next(b for b in at.button if b.proto.form_id == form and b.proto.is_form_submitter).click()
+        return action
+
+    @staticmethod
+    def click(key: str):
+        return lambda at: at.button(key=key).click()
+
+
+# ─── Scenarios ──────────────────────────────────────────────────────────────────
+_GUEST = {"authenticated": False, "current_page": "home"}
+_names = itertools.count()
+
+
+def _logged_in(user: dict, page: str) -> dict:
+    return {"authenticated": True, "user_id": user["id"], "username": user["username"],
+            "full_name": user["full_name"], "current_page": page}
+
+
+def scenario_register(make, users, rng):
+    s = make(_GUEST)
+    s.step("landing")
+    s.step("register.open", s.click("sb_register"))
+    name = f"lt{os.getpid()}_{next(_names)}"
+    s.step("register.submit", s.submit("register_form", {
+        "Full Name": "Load Test", "Username": name, "Email": f"{name}@example.com",
+        "Password": PASSWORD, "Confirm Password": PASSWORD,
+    }))
+
+
+def scenario_login(make, users, rng):
+    user = rng.choice(users)
+    s = make(_GUEST)
+    s.step("landing")
+    s.step("login.open", s.click("sb_signin"))
+    s.step("login.submit", s.submit("login_form", {"Username": user["username"], "Password": PASSWORD}))
+
+
+def scenario_dashboard(make, users, rng):
+    s = make(_logged_in(rng.choice(users), "home"))
+    s.step("dashboard")
+    s.step("dashboard.rerun")
+    if s.at.toggle:
+        s.step("dashboard.open_essay", lambda at: at.toggle[0].set_value(True))
+    s.step("dashboard.to_profile", s.click("dash_profile"))
+    s.step("dashboard.back", s.click("sb_home_auth"))
+
+
+def scenario_profile(make, users, rng):
+    s = make(_logged_in(rng.choice(users), "profile"))
+    s.step("profile")
+    s.step("profile.group_by", lambda at: at.selectbox(key="history_bucket").set_value(rng.choice(["Day", "Month"])))
+    s.step("profile.range", lambda at: at.selectbox(key="history_range").set_value("Last year"))
+    if s.state("history_cursor") is not None:
+        s.step("profile.load_more", s.click("history_load_more"))
+    s.step("profile.search", lambda at: at.text_input(key="history_search").input(rng.choice(SEARCH_TERMS)))
+    s.step("profile.clear_search", lambda at: at.text_input(key="history_search").input(""))
+
+
+def scenario_evaluate(make, users, rng):
+    from benchmarks.synthetic import make_essay, make_title
+
+    s = make(_logged_in(rng.choice(users), "evaluate"))
+    s.step("evaluate")
+    s.step("evaluate.submit", s.submit("essay_placeholder", {
+        "Essay Title": make_title(rng), "Essay Content": make_essay(rng, 400),
+    }))
+    deadline = time.monotonic() + POLL_TIMEOUT_S
+    while s.state("eval_job_id") and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL_S)
+        s.step("evaluate.poll")
+
+
+SCENARIOS = {
+    "register": scenario_register,
+    "login": scenario_login,
+    "dashboard": scenario_dashboard,
+    "profile": scenario_profile,
+    "evaluate": scenario_evaluate,
+}
+
+
+# ─── Session processes ──────────────────────────────────────────────────────────
+def _session_process(index: int, config: dict, barrier, results):
+    os.environ["SMARTSCRIBE_DB_PATH"] = config["db"]
+    os.environ["SMARTSCRIBE_EXTERNAL_WORKER"] = "1"
+    sys.path.insert(0, ROOT)
+    _count_db_work()
+
+    names, weights = zip(*config["mix"].items())
+    rng = random.Random(f"{config['seed']}:{config['level']}:{index}")
+    samples = []
+    make = lambda state: Session(state, config["think"], rng, samples)        # noqa: E731
+
+    # Pay for imports (the app, plotly) before the clock starts
+    Session(_GUEST, 0, rng, []).step("warmup")
+    Session(_logged_in(config["users"][0], "profile"), 0, rng, []).step("warmup")
+    barrier.wait()
+    deadline = time.perf_counter() + config["duration"]
+    errors = []
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(names, weights)[0]
+        try:
+            SCENARIOS[scenario](make, config["users"], rng)
+        except Exception as exc:                    # keep going; report it
+            errors.append(f"{scenario}: {exc}")
+    results.put((samples, errors))
+
+
+def _summary(samples, elapsed: float) -> dict:
+    wall = [s[1] for s in samples]
+    return {
+        "reruns": len(samples),
+        "reruns_per_sec": round(len(samples) / elapsed, 1),
+        "wall_ms": {"p50": round(_percentile(wall, 50), 1), "p95": round(_percentile(wall, 95), 1),
+                    "p99": round(_percentile(wall, 99), 1)},
+        "cpu_ms": round(statistics.fmean(s[2] for s in samples), 2),
+        "db_calls_per_rerun": round(statistics.fmean(s[3] for s in samples), 1),
+        "sql_per_rerun": round(statistics.fmean(s[4] for s in samples), 1),
+    }
+
+
+def run_level(sessions: int, config: dict) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    barrier, results = ctx.Barrier(sessions + 1), ctx.Queue()
+    config = dict(config, level=sessions)
+    procs = [ctx.Process(target=_session_process, args=(i, config, barrier, results)) for i in range(sessions)]
+    for p in procs:
+        p.start()
+    barrier.wait()
+    started = time.perf_counter()
+    collected = [results.get() for _ in procs]
+    elapsed = time.perf_counter() - started
+    for p in procs:
+        p.join()
+
+    samples = [s for batch, _ in collected for s in batch]
+    errors = [e for _, batch in collected for e in batch]
+    if not samples:
+        return {"sessions": sessions, "reruns": 0, "errors": errors}
+    steps = {}
+    for s in samples:
+        steps.setdefault(s[0], []).append(s)
+    return dict(
+        {"sessions": sessions}, **_summary(samples, elapsed),
+        errors=errors,
+        steps={name: _summary(group, elapsed) for name, group in sorted(steps.items())},
+    )
+
+
+# ─── Setup ──────────────────────────────────────────────────────────────────────
+def seed(users: int, essays_per_user: int, seed_value: int) -> list:
+    """Create `users` accounts sharing PASSWORD, each with some scored essays."""
+    from auth.passwords import hash_password
+    from benchmarks.synthetic import make_essay, make_title
+    from database import db
+
+    stored = hash_password(PASSWORD)        # hashed once, at the real cost – logins pay it
+    rng = random.Random(seed_value)
+    accounts = []
+    for i in range(users):
+        username = f"load{i}"
+        user_id = db.create_user(username, f"{username}@example.com", stored, f"Load User {i}")
+        rows = []
+        for _ in range(essays_per_user):
+            scores = [round(rng.uniform(3, 9.5), 1) for _ in range(3)]
+            rows.append((user_id, make_title(rng), make_essay(rng, 300), *scores,
+                         round(sum(scores) / 3, 1), "- **Grammar** – ok"))
+        with db.transaction(immediate=True) as conn:
+            db.save_essays_bulk(rows)
+            conn.execute(
+                "UPDATE essays SET submitted_at = datetime('now', '-' || (id % 365) || ' days') WHERE user_id = ?",
+                (user_id,),
+            )
+        accounts.append({"id": user_id, "username": username, "full_name": f"Load User {i}"})
+    return accounts
+
+
+def _parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name.strip()!r}; pick from {', '.join(SCENARIOS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def run(args) -> dict:
+    tmp = tempfile.mkdtemp(prefix="smartscribe-load-")
+    db_path = os.path.join(tmp, "load.db")
+    os.environ["SMARTSCRIBE_DB_PATH"] = db_path
+    sys.path.insert(0, ROOT)
+
+    from database import db
+    db.DB_PATH = db_path
+    db.init_db()
+    users = seed(args.users, args.essays_per_user, args.seed)
+
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "evaluation.worker", "--processes", str(args.eval_processes)],
+        cwd=ROOT, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    ) if "evaluate" in args.mix else None
+
+    config = {"db": db_path, "users": users, "mix": args.mix, "think": args.think,
+              "duration": args.duration, "seed": args.seed}
+    levels = []
+    try:
+        for sessions in args.sessions:
+            level = run_level(sessions, config)
+            levels.append(level)
+            if not args.json:
+                _print_level(level)
+    finally:
+        if worker is not None:
+            worker.terminate()
+            worker.wait()
+
+    return {
+        "meta": {"users": args.users, "essays_per_user": args.essays_per_user, "mix": args.mix,
+                 "think_s": args.think, "duration_s": args.duration, "cpus": os.cpu_count(),
+                 "p95_budget_ms": args.p95_budget_ms},
+        "levels": levels,
+        "ceiling": ceiling(levels, args.p95_budget_ms),
+    }
+
+
+def ceiling(levels: list, p95_budget_ms: float) -> dict:
+    """Largest measured level within budget, and where one server process would saturate."""
+    within = [lv["sessions"] for lv in levels if lv["reruns"] and lv["wall_ms"]["p95"] <= p95_budget_ms]
+    base = next((lv for lv in levels if lv["reruns"]), None)
+    estimate = None
+    if base and base["cpu_ms"]:
+        # Each session asks for this much CPU per second; one core supplies 1000 ms
+        demand = base["reruns_per_sec"] / base["sessions"] * base["cpu_ms"]
+        estimate = int(1000 / demand) if demand else None
+    return {"measured_sessions": max(within) if within else 0, "single_process_sessions": estimate}
+
+
+def _print_level(level: dict):
+    if not level["reruns"]:
+        print(f"{level['sessions']:>3} sessions: no reruns completed ({len(level['errors'])} errors)")
+        return
+    w = level["wall_ms"]
+    print(f"{level['sessions']:>3} sessions  {level['reruns_per_sec']:>7.1f} reruns/s  "
+          f"p50 {w['p50']:>7.1f}  p95 {w['p95']:>7.1f}  p99 {w['p99']:>7.1f} ms  "
+          f"cpu {level['cpu_ms']:>6.1f} ms  db {level['db_calls_per_rerun']:>4.1f}  "
+          f"sql {level['sql_per_rerun']:>5.1f}/rerun  "
+          f"errors {len(level['errors'])}")
+
+
+def _print_report(report: dict):
+    first = next((lv for lv in report["levels"] if lv["reruns"]), None)
+    if first:
+        print(f"\nPer interaction at {first['sessions']} session(s):")
+        print(f"  {'step':<24} {'n':>5} {'p50 ms':>8} {'p95 ms':>8} {'cpu ms':>8} {'db':>5} {'sql':>6}")
+        for name, st in first["steps"].items():
+            print(f"  {name:<24} {st['reruns']:>5} {st['wall_ms']['p50']:>8.1f} {st['wall_ms']['p95']:>8.1f} "
+                  f"{st['cpu_ms']:>8.1f} {st['db_calls_per_rerun']:>5.1f} {st['sql_per_rerun']:>6.1f}")
+    for level in report["levels"]:
+        for error in level["errors"][:3]:
+            print(f"  ! {level['sessions']} sessions: {error}")
+    c = report["ceiling"]
+    print(f"\nWithin p95 ≤ {report['meta']['p95_budget_ms']:.0f} ms up to {c['measured_sessions']} sessions measured.")
+    if c["single_process_sessions"]:
+        print(f"1-proc ceiling: ~{c['single_process_sessions']} sessions before one server process "
+              f"runs out of CPU at {report['meta']['think_s']} s think time.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app.py with concurrent simulated sessions.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrency levels")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per level")
+    parser.add_argument("--think", type=float, default=1.0, help="mean pause between interactions (s)")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix(DEFAULT_MIX),
+                        help=f"scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--users", type=int, default=50, help="accounts seeded for the logged-in scenarios")
+    parser.add_argument("--essays-per-user", type=int, default=40)
+    parser.add_argument("--eval-processes", type=int, default=2, help="scoring processes for the worker")
+    parser.add_argument("--p95-budget-ms", type=float, default=1000, help="acceptable p95 per interaction")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--out", help="also write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
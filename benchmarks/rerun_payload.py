@@ -0,0 +1,118 @@
+"""
+SmartScribe – Per-rerun payload size
+Run with:  python -m benchmarks.rerun_payload [--json]
+
+Drives each page through streamlit's AppTest and adds up the serialized size
+of every element the script emits – roughly what one rerun sends over the
+websocket. The first run of a session and a later rerun are reported
+separately, along with how much of each is stylesheet.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+
+# Inline <style> blocks, or the one-time stylesheet loader
+_STYLE_MARKERS = (b"<style", b"smartscribe-css")
+
+_LOGGED_OUT = {"authenticated": False}
+PAGES = {
+    "landing":   dict(_LOGGED_OUT, current_page="home"),
+    "login":     dict(_LOGGED_OUT, current_page="login"),
+    "register":  dict(_LOGGED_OUT, current_page="register"),
+    "dashboard": {"current_page": "home"},
+    "profile":   {"current_page": "profile"},
+    "evaluate":  {"current_page": "evaluate"},
+}
+
+
+def _element_sizes(node, out):
+    proto = getattr(node, "proto", None)
+    if proto is not None:
+        raw = proto.SerializeToString()
+        out.append((len(raw), any(m in raw for m in _STYLE_MARKERS)))
+    for child in getattr(node, "children", {}).values():
+        _element_sizes(child, out)
+    return out
+
+
+def _payload(at) -> dict:
+    sizes = _element_sizes(at._tree, [])
+    return {
+        "elements": len(sizes),
+        "bytes": sum(size for size, _ in sizes),
+        "style_bytes": sum(size for size, is_style in sizes if is_style),
+    }
+
+
+def _seed_user(essays: int) -> dict:
+    from benchmarks.synthetic import make_essay, make_title
+    from database import db
+
+    rng = random.Random(7)
+    user_id = db.create_user("payload", "payload@example.com", "x", "Payload Tester")
+    for _ in range(essays):
+        scores = [round(rng.uniform(4, 9), 1) for _ in range(4)]
+        db.save_essay(user_id, make_title(rng), make_essay(rng, 300), *scores, feedback="- **Grammar** – ok")
+    return {"authenticated": True, "user_id": user_id, "username": "payload", "full_name": "Payload Tester"}
+
+
+def measure(page: str, session: dict, reruns: int = 2) -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=30)
+    for key, value in session.items():
+        at.session_state[key] = value
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    first = _payload(at)
+    for _ in range(reruns):
+        at.run()
+    return {"page": page, "first_run": first, "rerun": _payload(at)}
+
+
+def run(essays: int = 20) -> list:
+    tmp = tempfile.mkdtemp(prefix="smartscribe-payload-")
+    os.environ["SMARTSCRIBE_DB_PATH"] = os.path.join(tmp, "payload.db")
+    os.environ["SMARTSCRIBE_EXTERNAL_WORKER"] = "1"    # don't start a worker in-process
+    sys.path.insert(0, ROOT)
+
+    from database import db
+    db.DB_PATH = os.environ["SMARTSCRIBE_DB_PATH"]
+    db.init_db()
+    user = _seed_user(essays)
+
+    results = []
+    for page, session in PAGES.items():
+        if "authenticated" not in session:
+            session = dict(user, **session)
+        results.append(measure(page, session))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure bytes emitted per Streamlit rerun, by page.")
+    parser.add_argument("--essays", type=int, default=20, help="essays seeded for the logged-in pages")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.essays)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'page':<10}  {'first run':>10}  {'of it CSS':>9}  {'rerun':>8}  {'of it CSS':>9}")
+    for r in results:
+        first, rerun = r["first_run"], r["rerun"]
+        print(f"{r['page']:<10}  {first['bytes']:>10,}  {first['style_bytes']:>9,}  "
+              f"{rerun['bytes']:>8,}  {rerun['style_bytes']:>9,}")
+
+
+if __name__ == "__main__":
+    main()
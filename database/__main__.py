@@ -0,0 +1,61 @@
+"""
+SmartScribe – Database maintenance commands
+Run with:  python -m database <command>
+"""
+
+import argparse
+import sys
+
+from database.db import (
+    DB_PATH,
+    compact_essay_bodies,
+    index_similarity,
+    init_db,
+    rebuild_search_index,
+    rebuild_user_stats,
+    schema_status,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m database", description="SmartScribe database maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    init = sub.add_parser("init", help="apply pending schema migrations (run before serving traffic)")
+    init.add_argument("--check", action="store_true", help="only report; exit 1 if migrations are pending")
+    sub.add_parser("rebuild-stats", help="recompute the per-user running stats from the essays table")
+    sub.add_parser("rebuild-search", help="re-index every essay for full-text search")
+    similar = sub.add_parser("index-similarity", help="compute near-duplicate signatures for essays that lack one")
+    similar.add_argument("--batch-size", type=int, default=500)
+    compact = sub.add_parser("compact-bodies", help="move inline essay text into compressed blobs and report space saved")
+    compact.add_argument("--vacuum", action="store_true", help="VACUUM afterwards so the file actually shrinks")
+    args = parser.parse_args(argv)
+
+    if args.command == "init" and args.check:
+        current, latest = schema_status()
+        print(f"{DB_PATH}: schema v{current}, code expects v{latest}.")
+        sys.exit(0 if current == latest else 1)
+
+    for step in init_db():
+        print(f"Migrated: {step}")
+    if args.command == "init":
+        current, _ = schema_status()
+        print(f"{DB_PATH}: schema is up to date (v{current}).")
+    elif args.command == "rebuild-stats":
+        users = rebuild_user_stats()
+        print(f"Rebuilt stats for {users} users.")
+    elif args.command == "rebuild-search":
+        essays = rebuild_search_index()
+        print(f"Indexed {essays} essays for search.")
+    elif args.command == "index-similarity":
+        essays = index_similarity(batch_size=args.batch_size)
+        print(f"Indexed {essays} essays for near-duplicate detection.")
+    elif args.command == "compact-bodies":
+        stats = compact_essay_bodies(vacuum=args.vacuum)
+        saved = stats["inline_bytes"] - stats["stored_bytes"]
+        print(f"Moved {stats['essays']} essay bodies into {stats['new_blobs']} new blobs "
+              f"({stats['inline_bytes']:,} → {stats['stored_bytes']:,} bytes, {saved:,} saved); "
+              f"removed {stats['orphans_removed']} orphaned blobs.")
+
+
+if __name__ == "__main__":
+    main()
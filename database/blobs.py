@@ -0,0 +1,39 @@
+"""
+SmartScribe – Essay body codec
+Essay text is stored once per distinct body in `essay_blobs`, keyed by its
+SHA-256 and zlib-compressed when that actually saves space.
+"""
+
+import hashlib
+import zlib
+
+ZLIB_LEVEL = 6
+CODEC_RAW = "raw"
+CODEC_ZLIB = "zlib"
+
+
+def encode_body(content: str):
+    """Return ``(hash, codec, raw_size, body)`` ready for an `essay_blobs` row."""
+    raw = content.encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    packed = zlib.compress(raw, ZLIB_LEVEL)
+    if len(packed) < len(raw):
+        return digest, CODEC_ZLIB, len(raw), packed
+    return digest, CODEC_RAW, len(raw), raw
+
+
+def decode_body(codec: str, body: bytes) -> str:
+    if codec == CODEC_ZLIB:
+        body = zlib.decompress(body)
+    elif codec != CODEC_RAW:
+        raise ValueError(f"Unknown essay body codec: {codec!r}")
+    return bytes(body).decode("utf-8")
+
+
+def register_sql_functions(conn):
+    """Expose ``essay_body(codec, body)`` to SQL – the v15 full-text search step indexes bodies with it."""
+    conn.create_function(
+        "essay_body", 2,
+        lambda codec, body: None if codec is None else decode_body(codec, body),
+        deterministic=True,
+    )
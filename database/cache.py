@@ -0,0 +1,73 @@
+"""
+SmartScribe – Read cache for the DB layer
+A process-wide LRU in front of the hottest per-user reads (user row, essay
+summaries, dashboard snapshot). Every entry is keyed on its user's version
+counter; writes through the DB layer bump the counter, so a changed row is
+never served from cache. A short TTL bounds staleness for writes made by
+other processes (e.g. an external worker).
+
+Cached values are shared between callers – treat them as read-only.
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_MAX_ENTRIES = 4096
+CACHE_TTL_S = 30.0
+
+_lock = threading.Lock()
+_entries = OrderedDict()            # key -> (expires_at, value)
+_versions = {}                      # user_id -> int
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def invalidate_user(user_id: int):
+    """Drop everything cached for `user_id` (lazily, via its version)."""
+    with _lock:
+        _versions[user_id] = _versions.get(user_id, 0) + 1
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+        _versions.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+        return {
+            **_stats,
+            "entries": len(_entries),
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
+
+
+def cached_per_user(kind: str):
+    """Cache a ``fn(user_id, ...)`` read under the user's current version."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(user_id, *args, **kwargs):
+            now = time.monotonic()
+            with _lock:
+                key = (kind, user_id, _versions.get(user_id, 0), args, tuple(sorted(kwargs.items())))
+                entry = _entries.get(key)
+                if entry is not None and entry[0] > now:
+                    _entries.move_to_end(key)
+                    _stats["hits"] += 1
+                    return entry[1]
+                _stats["misses"] += 1
+
+            value = fn(user_id, *args, **kwargs)
+
+            with _lock:
+                _entries[key] = (now + CACHE_TTL_S, value)
+                _entries.move_to_end(key)
+                while len(_entries) > CACHE_MAX_ENTRIES:
+                    _entries.popitem(last=False)
+                    _stats["evictions"] += 1
+            return value
+        return wrapper
+    return decorator
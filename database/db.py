@@ -3,95 +3,260 @@ SmartScribe – Database layer (SQLite)
 Handles all DB creation, user CRUD, and essay-submission CRUD.
 """
 
+import atexit
 import sqlite3
 import os
+import html
+import json
+import re
+import time
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
 
-DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "smartscribe.db")
+from database import querylog
+from database.blobs import decode_body, encode_body, register_sql_functions
+from database.cache import cached_per_user, invalidate_user, stats as cache_stats
+from database.downsample import lttb
+from database.minhash import band_keys, signature, similarity
+from database.writer import GroupCommitWriter
+from database.migrations import (
+    SCHEMA_VERSION,
+    current_version,
+    migrate,
+    move_bodies_to_blobs,
+    rebuild_search_index as _rebuild_search_index,
+    rebuild_user_stats as _rebuild_user_stats,
+)
+from telemetry.tracing import register_collector, trace_functions
 
+# SMARTSCRIBE_DB_PATH overrides the location; worker processes inherit it.
+DB_PATH = os.environ.get("SMARTSCRIBE_DB_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "smartscribe.db"
+)
 
-# ─── helpers ────────────────────────────────────────────────────────────────────
-def _get_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
+# Connection tuning – applied once when a pooled connection is opened.
+POOL_SIZE = 8                        # idle connections kept per process
+BUSY_TIMEOUT_MS = 5000               # wait this long on a locked DB before failing
+MMAP_SIZE = 256 * 1024 * 1024        # memory-map up to 256 MiB of the DB file
+# Batch concurrent inserts into shared transactions (see database/writer.py);
+# SMARTSCRIBE_GROUP_COMMIT=0 gives every insert its own transaction again.
+GROUP_COMMIT = os.environ.get("SMARTSCRIBE_GROUP_COMMIT", "1") != "0"
+
+
+# ─── Connection pool ────────────────────────────────────────────────────────────
+# Streamlit runs every rerun on a script thread. Each thread checks a long-lived
+# connection out of a small process-wide pool for the duration of a
+# ``connection()`` block; nested blocks on the same thread share it, so a view
+# can run several statements without reconnecting or re-applying PRAGMAs.
+_pool_lock = threading.Lock()
+_pool: list = []
+_pool_path = None
+_local = threading.local()
+
+
+def _open_connection() -> sqlite3.Connection:
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,           # transactions are managed explicitly
+        check_same_thread=False,        # connections move between script threads
+        # Times every statement when SMARTSCRIBE_SLOW_QUERY_MS is set
+        factory=querylog.TimedConnection if querylog.ENABLED else sqlite3.Connection,
+    )
     conn.row_factory = sqlite3.Row          # dict-like access
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
     conn.execute("PRAGMA foreign_keys = ON")
+    register_sql_functions(conn)            # the v15 full-text search step indexes bodies through it
     return conn
 
 
-def init_db():
-    """Create tables if they don't exist yet."""
-    conn = _get_connection()
-    cur = conn.cursor()
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS users (
-            id          INTEGER PRIMARY KEY AUTOINCREMENT,
-            username    TEXT    NOT NULL UNIQUE,
-            email       TEXT    NOT NULL UNIQUE,
-            password    TEXT    NOT NULL,
-            full_name   TEXT    DEFAULT '',
-            bio         TEXT    DEFAULT '',
-            avatar_url  TEXT    DEFAULT '',
-            created_at  TEXT    DEFAULT (datetime('now')),
-            updated_at  TEXT    DEFAULT (datetime('now'))
-        )
-    """)
+def _acquire() -> sqlite3.Connection:
+    global _pool_path
+    with _pool_lock:
+        if _pool_path != DB_PATH:           # DB_PATH was repointed – drop stale handles
+            while _pool:
+                _pool.pop().close()
+            _pool_path = DB_PATH
+        if _pool:
+            return _pool.pop()
+    return _open_connection()
 
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS essays (
-            id              INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id         INTEGER NOT NULL,
-            title           TEXT    DEFAULT 'Untitled Essay',
-            content         TEXT    NOT NULL,
-            grammar_score   REAL    DEFAULT 0,
-            coherence_score REAL    DEFAULT 0,
-            argument_score  REAL    DEFAULT 0,
-            overall_score   REAL    DEFAULT 0,
-            feedback        TEXT    DEFAULT '',
-            submitted_at    TEXT    DEFAULT (datetime('now')),
-            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
-    """)
 
-    conn.commit()
+def _release(conn: sqlite3.Connection):
+    if conn.in_transaction:
+        conn.rollback()
+    with _pool_lock:
+        if _pool_path == DB_PATH and len(_pool) < POOL_SIZE:
+            _pool.append(conn)
+            return
     conn.close()
 
 
+@contextmanager
+def connection():
+    """Yield a pooled connection; nested calls on the same thread reuse it."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield conn
+        return
+    conn = _acquire()
+    _local.conn = conn
+    try:
+        yield conn
+    finally:
+        _local.conn = None
+        _release(conn)
+
+
+@contextmanager
+def transaction(immediate: bool = False):
+    """Run the block in one transaction – committed on success, rolled back on error.
+
+    Writers should pass ``immediate=True`` so the write lock is taken up front
+    (and waited for via busy_timeout) instead of failing on a lock upgrade.
+    Nested calls join the enclosing transaction.
+    """
+    with connection() as conn:
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def close_all_connections():
+    """Close every idle pooled connection (e.g. before deleting the DB file)."""
+    with _pool_lock:
+        while _pool:
+            _pool.pop().close()
+
+
+# ─── Group commit ───────────────────────────────────────────────────────────────
+_writer_lock = threading.Lock()
+_group_writer = None
+
+
+def _writer() -> GroupCommitWriter:
+    global _group_writer
+    with _writer_lock:
+        if _group_writer is None or _group_writer.pid != os.getpid():
+            _group_writer = GroupCommitWriter(transaction)
+            atexit.register(_group_writer.close)
+        return _group_writer
+
+
+def _write(fn, *args, after=None) -> Future:
+    """Run ``fn(conn, *args)`` in a write transaction, batched with other threads' writes.
+
+    Inside an open transaction the write joins it instead – handing it to the
+    writer thread would wait on the lock this thread already holds.
+    """
+    conn = getattr(_local, "conn", None)
+    if GROUP_COMMIT and not (conn is not None and conn.in_transaction):
+        return _writer().submit(fn, *args, after=after)
+    future = Future()
+    try:
+        with transaction(immediate=True) as conn:
+            result = fn(conn, *args)
+    except Exception as exc:
+        future.set_exception(exc)
+        return future
+    if after is not None:
+        after(result)
+    future.set_result(result)
+    return future
+
+
+def init_db() -> list:
+    """Bring the schema up to date; returns the migration steps applied."""
+    with connection() as conn:
+        return migrate(conn)
+
+
+_ready_lock = threading.Lock()
+_ready_path = None
+
+
+def ensure_db():
+    """Once per process (and DB_PATH): check the schema version, migrating if behind.
+
+    Cheap enough to call on every Streamlit rerun – after the first call it is
+    a single comparison.
+    """
+    global _ready_path
+    if _ready_path == DB_PATH:
+        return
+    with _ready_lock:
+        if _ready_path == DB_PATH:
+            return
+        with connection() as conn:
+            version = current_version(conn)
+            if version > SCHEMA_VERSION:
+                raise RuntimeError(
+                    f"Database schema v{version} is newer than this code (v{SCHEMA_VERSION}); "
+                    "deploy the matching release."
+                )
+            if version < SCHEMA_VERSION:
+                migrate(conn)
+        _ready_path = DB_PATH
+
+
+def schema_status() -> tuple:
+    """``(current, latest)`` schema versions of the configured database."""
+    with connection() as conn:
+        return current_version(conn), SCHEMA_VERSION
+
+
 # ─── User operations ────────────────────────────────────────────────────────────
-def create_user(username: str, email: str, hashed_pw: str, full_name: str = "") -> int:
-    conn = _get_connection()
-    cur = conn.cursor()
-    cur.execute(
+def _insert_user(conn: sqlite3.Connection, username: str, email: str, hashed_pw: str, full_name: str) -> int:
+    return conn.execute(
         "INSERT INTO users (username, email, password, full_name) VALUES (?, ?, ?, ?)",
         (username, email, hashed_pw, full_name),
-    )
-    conn.commit()
-    uid = cur.lastrowid
-    conn.close()
-    return uid
+    ).lastrowid
+
+
+def create_user_async(username: str, email: str, hashed_pw: str, full_name: str = "") -> Future:
+    """Queue a new user on the group-commit writer; resolves to its id once committed."""
+    return _write(_insert_user, username, email, hashed_pw, full_name, after=invalidate_user)
+
+
+def create_user(username: str, email: str, hashed_pw: str, full_name: str = "") -> int:
+    return create_user_async(username, email, hashed_pw, full_name).result()
 
 
 def get_user_by_username(username: str):
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
-    conn.close()
+    with connection() as conn:
+        row = conn.execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
     return dict(row) if row else None
 
 
 def get_user_by_email(email: str):
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
-    conn.close()
+    with connection() as conn:
+        row = conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
     return dict(row) if row else None
 
 
-def get_user_by_id(user_id: int):
-    conn = _get_connection()
-    row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
-    conn.close()
+def _get_user_by_id(user_id: int):
+    with connection() as conn:
+        row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
     return dict(row) if row else None
 
 
+@cached_per_user("user")
+def get_user_by_id(user_id: int):
+    return _get_user_by_id(user_id)
+
+
 def update_user(user_id: int, **kwargs):
     """Update arbitrary columns: update_user(1, full_name='New', bio='…')"""
     allowed = {"full_name", "bio", "avatar_url", "email", "password"}
@@ -100,63 +265,678 @@ def update_user(user_id: int, **kwargs):
         return
     set_clause = ", ".join(f"{k} = ?" for k in fields)
     values = list(fields.values()) + [datetime.utcnow().isoformat(), user_id]
-    conn = _get_connection()
+    with transaction(immediate=True) as conn:
+        conn.execute(
+            f"UPDATE users SET {set_clause}, updated_at = ? WHERE id = ?", values
+        )
+    invalidate_user(user_id)
+
+
+def replace_password_hash(user_id: int, old_hash: str, new_hash: str) -> bool:
+    """Swap in a re-hashed password unless it was changed in the meantime."""
+    with transaction(immediate=True) as conn:
+        cur = conn.execute(
+            "UPDATE users SET password = ? WHERE id = ? AND password = ?",
+            (new_hash, user_id, old_hash),
+        )
+    invalidate_user(user_id)
+    return cur.rowcount == 1
+
+
+# ─── Essay operations ────────────────────────────────────────────────────────────
+def _index_search(conn: sqlite3.Connection, docs: list):
+    """Add blob-stored essays to the search index – their text only exists here in Python.
+
+    `docs` are ``(essay_id, title, content, feedback, owner)``; inline bodies,
+    deletes and edits are kept in step by triggers.
+    """
+    conn.executemany(
+        "INSERT INTO essay_search (rowid, title, content, feedback, owner) VALUES (?, ?, ?, ?, ?)",
+        docs,
+    )
+
+
+def _insert_essay(conn: sqlite3.Connection, user_id: int, title: str, content: str, encoded: tuple,
+                  scores: tuple, feedback: str, sig, paragraphs) -> int:
+    digest, codec, raw_size, body = encoded
     conn.execute(
-        f"UPDATE users SET {set_clause}, updated_at = ? WHERE id = ?", values
+        "INSERT OR IGNORE INTO essay_blobs (hash, codec, raw_size, body) VALUES (?, ?, ?, ?)",
+        (digest, codec, raw_size, body),
+    )
+    cur = conn.execute(
+        """INSERT INTO essays
+           (user_id, title, content, blob_hash, grammar_score, coherence_score,
+            argument_score, overall_score, feedback)
+           VALUES (?, ?, '', ?, ?, ?, ?, ?, ?)""",
+        (user_id, title, digest, *scores, feedback),
+    )
+    essay_id = cur.lastrowid
+    _index_search(conn, [(essay_id, title, content, feedback, f"u{user_id}")])
+    if sig:
+        _index_signature(conn, essay_id, sig)
+    if paragraphs:
+        conn.executemany(
+            "INSERT INTO essay_paragraphs (essay_id, position, para_hash, features) VALUES (?, ?, ?, ?)",
+            [(essay_id, i, p["hash"], json.dumps(p["features"])) for i, p in enumerate(paragraphs)],
+        )
+    return essay_id
+
+
+def save_essay_async(user_id: int, title: str, content: str,
+                     grammar: float = 0, coherence: float = 0,
+                     argument: float = 0, overall: float = 0,
+                     feedback: str = "", paragraphs=None) -> Future:
+    """Queue a scored essay on the group-commit writer; resolves to its id once committed."""
+    encoded = encode_body(content)          # compress and sign outside the write lock
+    sig = signature(content)
+    return _write(
+        _insert_essay, user_id, title, content, encoded, (grammar, coherence, argument, overall), feedback, sig,
+        paragraphs,
+        after=lambda _: invalidate_user(user_id),
     )
-    conn.commit()
-    conn.close()
 
 
-# ─── Essay operations ────────────────────────────────────────────────────────────
 def save_essay(user_id: int, title: str, content: str,
                grammar: float = 0, coherence: float = 0,
                argument: float = 0, overall: float = 0,
-               feedback: str = "") -> int:
-    conn = _get_connection()
-    cur = conn.cursor()
-    cur.execute(
-        """INSERT INTO essays
-           (user_id, title, content, grammar_score, coherence_score,
-            argument_score, overall_score, feedback)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-        (user_id, title, content, grammar, coherence, argument, overall, feedback),
-    )
-    conn.commit()
-    eid = cur.lastrowid
-    conn.close()
-    return eid
+               feedback: str = "", paragraphs=None) -> int:
+    """Insert a scored essay.
+
+    `paragraphs` is the evaluation result's per-paragraph list
+    (``{"hash", "features"}`` dicts); it is stored so the next draft with the
+    same title only re-analyzes paragraphs that changed.
+    """
+    return save_essay_async(user_id, title, content, grammar, coherence, argument, overall,
+                            feedback, paragraphs).result()
+
+
+def save_essays_bulk(rows) -> int:
+    """Insert many scored essays with batched statements in one transaction.
+
+    `rows` are ``(user_id, title, content, grammar, coherence, argument,
+    overall, feedback)`` tuples. Joins the caller's transaction if one is open.
+    """
+    blobs, essays, contents, sigs = [], [], [], []
+    for user_id, title, content, grammar, coherence, argument, overall, feedback in rows:
+        contents.append(content)
+        digest, codec, raw_size, body = encode_body(content)
+        blobs.append((digest, codec, raw_size, body))
+        essays.append((user_id, title, digest, grammar, coherence, argument, overall, feedback))
+        sigs.append(signature(content))
+    with transaction(immediate=True) as conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO essay_blobs (hash, codec, raw_size, body) VALUES (?, ?, ?, ?)",
+            blobs,
+        )
+        conn.executemany(
+            """INSERT INTO essays
+               (user_id, title, content, blob_hash, grammar_score, coherence_score,
+                argument_score, overall_score, feedback)
+               VALUES (?, ?, '', ?, ?, ?, ?, ?, ?)""",
+            essays,
+        )
+        # Rows inserted under one write lock get consecutive ids
+        last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+        ids = range(last_id - len(essays) + 1, last_id + 1)
+        _index_search(conn, [(essay_id, e[1], content, e[7], f"u{e[0]}")
+                             for essay_id, e, content in zip(ids, essays, contents)])
+        for essay_id, sig in zip(ids, sigs):
+            if sig:
+                _index_signature(conn, essay_id, sig)
+    for user_id in {e[0] for e in essays}:
+        invalidate_user(user_id)
+    return len(essays)
+
+
+# Everything needed to list an essay without shipping its body or feedback.
+ESSAY_SUMMARY_COLUMNS = (
+    "id, user_id, title, grammar_score, coherence_score, "
+    "argument_score, overall_score, submitted_at"
+)
+
+
+@cached_per_user("essays")
+def list_user_essays(user_id: int, limit: int = 20, cursor=None):
+    """One page of essay summaries, newest first.
+
+    `cursor` is the ``(submitted_at, id)`` pair returned by the previous page.
+    Returns ``(rows, next_cursor)``; `next_cursor` is None on the last page.
+    """
+    return _list_user_essays(user_id, limit, cursor)
+
+
+def _list_user_essays(user_id: int, limit: int, cursor):
+    sql = f"SELECT {ESSAY_SUMMARY_COLUMNS} FROM essays WHERE user_id = ?"
+    params = [user_id]
+    if cursor is not None:
+        sql += " AND (submitted_at, id) < (?, ?)"
+        params += list(cursor)
+    sql += " ORDER BY submitted_at DESC, id DESC LIMIT ?"
+    params.append(limit + 1)                # one extra row tells us if there's more
+
+    with connection() as conn:
+        rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, (rows[-1]["submitted_at"], rows[-1]["id"])
+    return rows, None
 
 
 def get_user_essays(user_id: int, limit: int = 50):
-    conn = _get_connection()
-    rows = conn.execute(
-        "SELECT * FROM essays WHERE user_id = ? ORDER BY submitted_at DESC LIMIT ?",
-        (user_id, limit),
-    ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
+    """Summaries of the user's `limit` most recent essays."""
+    rows, _ = list_user_essays(user_id, limit=limit)
+    return rows
+
+
+# Private-use markers around matched terms; swapped for <mark> after escaping
+_HIT_OPEN, _HIT_CLOSE = "\ue000", "\ue001"
+
+
+def _search_match(query: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must match, the last
+    one (3+ characters) as a prefix so results follow the user's typing."""
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return ""
+    match = " ".join(f'"{t}"' for t in terms)
+    return match + "*" if len(terms[-1]) >= 3 else match
+
+
+def _mark_hits(conn: sqlite3.Connection, match: str, user_id: int, rows: list) -> dict:
+    """``{essay_id: (title, snippet)}`` with the matched terms between the hit markers.
+
+    The search index is contentless, so the page's essays are decoded and
+    re-matched in a scratch FTS5 table with the same tokenizer – the marks
+    follow FTS5's own stemming and prefix rules exactly.
+    """
+    if not rows:
+        return {}
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS search_hit_docs (title, content, feedback, owner)")
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS temp.search_hits USING fts5(
+            title, content, feedback, owner, content = 'search_hit_docs',
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute("DELETE FROM temp.search_hit_docs")
+    conn.executemany(
+        "INSERT INTO temp.search_hit_docs (rowid, title, content, feedback, owner) VALUES (?, ?, ?, ?, ?)",
+        [(r["id"], r["title"], r["content"] if r["codec"] is None else decode_body(r["codec"], r["body"]),
+          r["feedback"], f"u{int(user_id)}") for r in rows],
+    )
+    # 'rebuild' drops the previous page's entries and indexes this one's
+    conn.execute("INSERT INTO temp.search_hits (search_hits) VALUES ('rebuild')")
+    return {
+        essay_id: (title, snippet)
+        for essay_id, title, snippet in conn.execute(
+            """SELECT rowid, highlight(search_hits, 0, :open, :close),
+                      snippet(search_hits, 1, :open, :close, '…', 24)
+               FROM temp.search_hits WHERE search_hits MATCH :match""",
+            {"open": _HIT_OPEN, "close": _HIT_CLOSE, "match": match},
+        )
+    }
+
+
+def _marked_html(text: str) -> str:
+    return html.escape(text or "").replace(_HIT_OPEN, "<mark>").replace(_HIT_CLOSE, "</mark>")
+
+
+@cached_per_user("search")
+def search_essays(user_id: int, query: str, limit: int = 10, offset: int = 0):
+    """The user's essays matching `query`, best first (bm25, titles weigh most).
+
+    Each row is an essay summary plus HTML-safe `title_html` and
+    `snippet_html` with the matched terms wrapped in ``<mark>``.
+    Returns ``(rows, next_offset)``; `next_offset` is None on the last page.
+    """
+    terms = _search_match(query)
+    if not terms:
+        return [], None
+    columns = ", ".join(f"e.{c.strip()}" for c in ESSAY_SUMMARY_COLUMNS.split(","))
+    sql = f"""SELECT {columns}, e.content, e.feedback, b.codec, b.body
+              FROM essay_search JOIN essays e ON e.id = essay_search.rowid
+              LEFT JOIN essay_blobs b ON b.hash = e.blob_hash
+              WHERE essay_search MATCH :match
+              ORDER BY bm25(essay_search, 10.0, 1.0, 2.0, 0.0)
+              LIMIT :limit OFFSET :offset"""
+    match = f'owner : "u{int(user_id)}" AND {{title content feedback}} : ({terms})'
+    params = {"match": match, "limit": limit + 1, "offset": offset}
+    with connection() as conn:
+        rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+        hits = _mark_hits(conn, match, user_id, rows[:limit])
+    for row in rows:
+        for key in ("content", "feedback", "codec", "body"):
+            del row[key]
+        title_hit, snippet = hits.get(row["id"], (row["title"], ""))
+        row["title_html"] = _marked_html(title_hit)
+        row["snippet_html"] = _marked_html(snippet)
+    if len(rows) > limit:
+        return rows[:limit], offset + limit
+    return rows, None
+
+
+def get_essay_content(essay_id: int, user_id: int = None):
+    """Body and feedback of one essay, loaded on demand (optionally owner-checked)."""
+    sql = """SELECT e.id, e.content, e.feedback, b.codec, b.body
+             FROM essays e LEFT JOIN essay_blobs b ON b.hash = e.blob_hash
+             WHERE e.id = ?"""
+    params = [essay_id]
+    if user_id is not None:
+        sql += " AND e.user_id = ?"
+        params.append(user_id)
+    with connection() as conn:
+        row = conn.execute(sql, params).fetchone()
+    if not row:
+        return None
+    content = decode_body(row["codec"], row["body"]) if row["codec"] else row["content"]
+    return {"id": row["id"], "content": content, "feedback": row["feedback"]}
+
+
+def get_paragraph_features(user_id: int, title: str) -> dict:
+    """``{para_hash: features}`` of the user's latest essay with this title."""
+    with connection() as conn:
+        rows = conn.execute(
+            """SELECT para_hash, features FROM essay_paragraphs
+               WHERE essay_id = (SELECT id FROM essays WHERE user_id = ? AND title = ?
+                                 ORDER BY submitted_at DESC, id DESC LIMIT 1)""",
+            (user_id, title),
+        ).fetchall()
+    return {r["para_hash"]: json.loads(r["features"]) for r in rows}
 
 
 def get_essay_count(user_id: int) -> int:
-    conn = _get_connection()
-    row = conn.execute(
-        "SELECT COUNT(*) as cnt FROM essays WHERE user_id = ?", (user_id,)
-    ).fetchone()
-    conn.close()
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT essay_count AS cnt FROM user_stats WHERE user_id = ?", (user_id,)
+        ).fetchone()
     return row["cnt"] if row else 0
 
 
 def get_average_scores(user_id: int):
-    conn = _get_connection()
-    row = conn.execute(
-        """SELECT
-               ROUND(AVG(grammar_score),  1) AS avg_grammar,
-               ROUND(AVG(coherence_score),1) AS avg_coherence,
-               ROUND(AVG(argument_score), 1) AS avg_argument,
-               ROUND(AVG(overall_score),  1) AS avg_overall
-           FROM essays WHERE user_id = ?""",
-        (user_id,),
-    ).fetchone()
-    conn.close()
-    return dict(row) if row else {}
+    with connection() as conn:
+        row = conn.execute(
+            """SELECT
+                   ROUND(grammar_sum   / essay_count, 1) AS avg_grammar,
+                   ROUND(coherence_sum / essay_count, 1) AS avg_coherence,
+                   ROUND(argument_sum  / essay_count, 1) AS avg_argument,
+                   ROUND(overall_sum   / essay_count, 1) AS avg_overall
+               FROM user_stats WHERE user_id = ? AND essay_count > 0""",
+            (user_id,),
+        ).fetchone()
+    if row:
+        return dict(row)
+    return {"avg_grammar": None, "avg_coherence": None, "avg_argument": None, "avg_overall": None}
+
+
+# SQL mapping submitted_at to the first day of its bucket (weeks start Monday)
+SCORE_BUCKETS = {
+    "day":   "date(submitted_at)",
+    "week":  "date(submitted_at, 'weekday 0', '-6 days')",
+    "month": "date(submitted_at, 'start of month')",
+}
+MAX_SERIES_POINTS = 200
+
+
+@cached_per_user("series")
+def get_score_series(user_id: int, bucket: str = "week", since: str = None, until: str = None,
+                     max_points: int = MAX_SERIES_POINTS) -> dict:
+    """Average scores per day/week/month, oldest first, aggregated in SQL.
+
+    `since`/`until` bound submitted_at (``'YYYY-MM-DD'``; `until` exclusive).
+    Longer series are downsampled with LTTB on the overall score, so at most
+    `max_points` points come back however long the history is. Returns
+    ``{"points": [...], "buckets": total, "essays": total}``.
+    """
+    if bucket not in SCORE_BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(SCORE_BUCKETS)}")
+    sql = f"""SELECT {SCORE_BUCKETS[bucket]} AS bucket,
+                     COUNT(*)                         AS essays,
+                     ROUND(AVG(overall_score),   2)   AS overall,
+                     ROUND(AVG(grammar_score),   2)   AS grammar,
+                     ROUND(AVG(coherence_score), 2)   AS coherence,
+                     ROUND(AVG(argument_score),  2)   AS argument
+              FROM essays WHERE user_id = ?"""
+    params = [user_id]
+    if since:
+        sql += " AND submitted_at >= ?"
+        params.append(since)
+    if until:
+        sql += " AND submitted_at < ?"
+        params.append(until)
+    sql += " GROUP BY bucket ORDER BY bucket"
+
+    with connection() as conn:
+        rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+    xs = [datetime.fromisoformat(r["bucket"]).toordinal() for r in rows]
+    keep = lttb(xs, [r["overall"] for r in rows], max_points)
+    return {
+        "points": [rows[i] for i in keep],
+        "buckets": len(rows),
+        "essays": sum(r["essays"] for r in rows),
+    }
+
+
+def rebuild_user_stats() -> int:
+    """Recompute the per-user running stats from scratch (repairs drift)."""
+    with transaction(immediate=True) as conn:
+        return _rebuild_user_stats(conn)
+
+
+def rebuild_search_index() -> int:
+    """Re-index every essay for full-text search (backfill or repair)."""
+    with transaction(immediate=True) as conn:
+        return _rebuild_search_index(conn)
+
+
+def compact_essay_bodies(vacuum: bool = False) -> dict:
+    """Move any inline essay bodies into blob storage and drop orphaned blobs.
+
+    Returns the counters from the move plus `orphans_removed`. The file only
+    shrinks on disk after a VACUUM, which rewrites the whole DB.
+    """
+    with transaction(immediate=True) as conn:
+        stats = move_bodies_to_blobs(conn)
+        stats["orphans_removed"] = conn.execute(
+            "DELETE FROM essay_blobs WHERE NOT EXISTS "
+            "(SELECT 1 FROM essays WHERE essays.blob_hash = essay_blobs.hash)"
+        ).rowcount
+    if vacuum:
+        with connection() as conn:
+            conn.execute("VACUUM")
+    return stats
+
+
+# ─── Near-duplicate detection ───────────────────────────────────────────────────
+SIMILARITY_THRESHOLD = 0.8
+MAX_SIMILARITY_CANDIDATES = 200     # caps work when a band bucket is very common
+
+
+def _index_signature(conn: sqlite3.Connection, essay_id: int, sig: bytes):
+    conn.execute("INSERT OR REPLACE INTO essay_minhash (essay_id, signature) VALUES (?, ?)", (essay_id, sig))
+    conn.executemany(
+        "INSERT OR IGNORE INTO essay_lsh (band, bucket, essay_id) VALUES (?, ?, ?)",
+        [(band, bucket, essay_id) for band, bucket in band_keys(sig)],
+    )
+
+
+def find_similar_essays(content: str, exclude_user_id: int = None,
+                        threshold: float = SIMILARITY_THRESHOLD, limit: int = 5) -> list:
+    """Indexed essays that `content` nearly copies, most similar first.
+
+    Candidates come from the LSH buckets (one index seek per band); only
+    those are compared signature by signature. Rows are ``{essay_id,
+    user_id, similarity}``; pass `exclude_user_id` to skip the author's own
+    earlier drafts.
+    """
+    sig = signature(content)
+    if sig is None:
+        return []
+    keys = band_keys(sig)
+    params = [v for key in keys for v in key]
+    # The author's own drafts are dropped before the cap, so a user with many
+    # revisions can't fill it and crowd out someone else's near-copy
+    exclude = ""
+    if exclude_user_id is not None:
+        exclude = "WHERE e.user_id != ?"
+        params.append(exclude_user_id)
+    params.append(MAX_SIMILARITY_CANDIDATES)
+    # CROSS JOIN pins the join order: one primary-key seek per band
+    sql = f"""WITH keys (band, bucket) AS (VALUES {", ".join("(?, ?)" for _ in keys)}),
+                   candidates AS (
+                       SELECT DISTINCT l.essay_id, e.user_id FROM keys
+                       CROSS JOIN essay_lsh l ON l.band = keys.band AND l.bucket = keys.bucket
+                       JOIN essays e ON e.id = l.essay_id
+                       {exclude}
+                       LIMIT ?)
+              SELECT c.essay_id, c.user_id, m.signature
+              FROM candidates c
+              JOIN essay_minhash m ON m.essay_id = c.essay_id"""
+    with connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    matches = []
+    for row in rows:
+        score = similarity(sig, row["signature"])
+        if score >= threshold:
+            matches.append({"essay_id": row["essay_id"], "user_id": row["user_id"], "similarity": round(score, 3)})
+    matches.sort(key=lambda m: m["similarity"], reverse=True)
+    return matches[:limit]
+
+
+def index_similarity(batch_size: int = 500) -> int:
+    """Sign essays saved before the similarity index existed; returns how many.
+
+    Each batch commits on its own, so an interrupted run just resumes.
+    """
+    indexed, last_id = 0, 0
+    while True:
+        with connection() as conn:
+            rows = conn.execute(
+                """SELECT e.id, e.content, b.codec, b.body
+                   FROM essays e
+                   LEFT JOIN essay_blobs b ON b.hash = e.blob_hash
+                   WHERE e.id > ? AND NOT EXISTS (SELECT 1 FROM essay_minhash m WHERE m.essay_id = e.id)
+                   ORDER BY e.id LIMIT ?""",
+                (last_id, batch_size),
+            ).fetchall()
+        if not rows:
+            return indexed
+        # Hash outside the write lock; only the inserts hold it
+        sigs = [
+            (r["id"], signature(decode_body(r["codec"], r["body"]) if r["codec"] else r["content"]))
+            for r in rows
+        ]
+        with transaction(immediate=True) as conn:
+            for essay_id, sig in sigs:
+                if sig:
+                    _index_signature(conn, essay_id, sig)
+                    indexed += 1
+        last_id = rows[-1]["id"]
+
+
+# ─── Evaluation jobs ────────────────────────────────────────────────────────────
+JOB_MAX_ATTEMPTS = 3
+
+
+def _insert_job(conn: sqlite3.Connection, user_id: int, title: str, content: str) -> int:
+    return conn.execute(
+        "INSERT INTO jobs (user_id, title, content) VALUES (?, ?, ?)",
+        (user_id, title, content),
+    ).lastrowid
+
+
+def enqueue_evaluation(user_id: int, title: str, content: str) -> int:
+    """Queue an essay for the background worker; returns the job id.
+
+    A deadline rush is mostly these inserts, so they go through the
+    group-commit writer too.
+    """
+    return _write(_insert_job, user_id, title, content).result()
+
+
+def claim_jobs(worker: str, limit: int = 1):
+    """Atomically move up to `limit` queued jobs to 'running' for `worker`.
+
+    The rows come back as claimed – status, worker and the incremented
+    attempts – oldest job first.
+    """
+    with transaction(immediate=True) as conn:
+        rows = conn.execute(
+            """UPDATE jobs SET status = 'running', attempts = attempts + 1, worker = ?,
+                              progress = '', started_at = datetime('now')
+               WHERE id IN (SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT ?)
+               RETURNING id, user_id, title, content, status, attempts, worker""",
+            (worker, limit),
+        ).fetchall()
+    return sorted((dict(r) for r in rows), key=lambda job: job["id"])
+
+
+def complete_job(job_id: int, result: dict) -> int:
+    """Save the scored essay and mark its job done, in one transaction."""
+    scores = result["scores"]
+    with transaction(immediate=True) as conn:
+        job = conn.execute("SELECT user_id, title, content FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        essay_id = save_essay(
+            job["user_id"], job["title"], job["content"],
+            scores.get("grammar", 0), scores.get("coherence", 0),
+            scores.get("argument", 0), result["overall"], result["feedback"],
+            paragraphs=result.get("paragraphs"),
+        )
+        conn.execute(
+            "UPDATE jobs SET status = 'done', essay_id = ?, result = ?, content = '', "
+            "finished_at = datetime('now') WHERE id = ?",
+            (essay_id, json.dumps(result), job_id),
+        )
+    invalidate_user(job["user_id"])     # again, now that the outer transaction committed
+    return essay_id
+
+
+def fail_job(job_id: int, error: str, retry: bool = True):
+    """Record a failure; the job is retried until JOB_MAX_ATTEMPTS is reached."""
+    max_attempts = JOB_MAX_ATTEMPTS if retry else 0
+    with transaction(immediate=True) as conn:
+        conn.execute(
+            """UPDATE jobs SET
+                   status = CASE WHEN attempts < ? THEN 'queued' ELSE 'failed' END,
+                   error = ?,
+                   finished_at = CASE WHEN attempts < ? THEN NULL ELSE datetime('now') END
+               WHERE id = ?""",
+            (max_attempts, error, max_attempts, job_id),
+        )
+
+
+def requeue_stale_jobs(older_than_s: int = 600) -> int:
+    """Put 'running' jobs whose worker vanished back on the queue."""
+    with transaction(immediate=True) as conn:
+        return conn.execute(
+            "UPDATE jobs SET status = 'queued' WHERE status = 'running' "
+            "AND started_at < datetime('now', ?)",
+            (f"-{int(older_than_s)} seconds",),
+        ).rowcount
+
+
+def update_job_progress(job_id: int, progress: dict):
+    """Publish partial results of a running job for the polling page."""
+    with transaction(immediate=True) as conn:
+        conn.execute(
+            "UPDATE jobs SET progress = ? WHERE id = ? AND status = 'running'",
+            (json.dumps(progress), job_id),
+        )
+
+
+def get_job(job_id: int, user_id: int = None):
+    """Status of one job; `result` and `progress` are decoded when present."""
+    sql = ("SELECT id, user_id, title, status, attempts, essay_id, result, progress, error "
+           "FROM jobs WHERE id = ?")
+    params = [job_id]
+    if user_id is not None:
+        sql += " AND user_id = ?"
+        params.append(user_id)
+    with connection() as conn:
+        row = conn.execute(sql, params).fetchone()
+    if not row:
+        return None
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+    return job
+
+
+# ─── Evaluation cache ───────────────────────────────────────────────────────────
+EVICT_TO = 0.9                      # eviction trims the cache to this share of its bounds
+EVICT_BATCH = 64                    # oldest entries deleted per step while over the byte bound
+
+def get_cached_evaluation(content_hash: str, engine_version: str):
+    """Cached result for a normalized-content hash, refreshing its LRU position."""
+    with connection() as conn:
+        row = conn.execute(
+            "SELECT result FROM eval_cache WHERE content_hash = ? AND engine_version = ?",
+            (content_hash, engine_version),
+        ).fetchone()
+    if not row:
+        return None                     # a miss never takes the write lock
+    with transaction(immediate=True) as conn:
+        conn.execute(
+            "UPDATE eval_cache SET hits = hits + 1, last_used_at = ? "
+            "WHERE content_hash = ? AND engine_version = ?",
+            (time.time(), content_hash, engine_version),
+        )
+    return json.loads(row["result"])
+
+
+def put_cached_evaluation(content_hash: str, engine_version: str, result: dict,
+                          max_entries: int, max_bytes: int):
+    """Store a result; past either bound, evict least-recently-used entries in a batch.
+
+    The bounds are checked against the trigger-maintained eval_cache_stats
+    row, so a store costs the same at 200 entries as at 50,000.
+    """
+    payload = json.dumps(result)
+    with transaction(immediate=True) as conn:
+        # An upsert, not INSERT OR REPLACE: REPLACE's implicit delete doesn't fire triggers
+        conn.execute(
+            """INSERT INTO eval_cache (content_hash, engine_version, result, size, last_used_at)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (content_hash, engine_version) DO UPDATE SET
+                   result = excluded.result, size = excluded.size, last_used_at = excluded.last_used_at""",
+            (content_hash, engine_version, payload, len(payload), time.time()),
+        )
+        entries, size = conn.execute("SELECT entries, bytes FROM eval_cache_stats").fetchone()
+        if entries <= max_entries and size <= max_bytes:
+            return
+        # Down to a low-water mark, so the stores that follow don't each evict a few rows
+        keep_entries, keep_bytes = int(max_entries * EVICT_TO), int(max_bytes * EVICT_TO)
+        while entries > 0 and (entries > keep_entries or size > keep_bytes):
+            conn.execute(
+                "DELETE FROM eval_cache WHERE rowid IN "
+                "(SELECT rowid FROM eval_cache ORDER BY last_used_at LIMIT ?)",
+                (entries - keep_entries if entries > keep_entries else EVICT_BATCH,),
+            )
+            entries, size = conn.execute("SELECT entries, bytes FROM eval_cache_stats").fetchone()
+
+
+# ─── Bulk ingestion checkpoints ─────────────────────────────────────────────────
+def get_ingest_checkpoint(source: str) -> int:
+    """Number of input records of `source` already committed (0 if new)."""
+    with connection() as conn:
+        row = conn.execute("SELECT position FROM ingest_checkpoints WHERE source = ?", (source,)).fetchone()
+    return row["position"] if row else 0
+
+
+def set_ingest_checkpoint(source: str, position: int):
+    """Record progress; call inside the transaction that wrote the records."""
+    with transaction(immediate=True) as conn:
+        conn.execute(
+            """INSERT INTO ingest_checkpoints (source, position) VALUES (?, ?)
+               ON CONFLICT (source) DO UPDATE SET
+                   position = excluded.position, updated_at = datetime('now')""",
+            (source, position),
+        )
+
+
+# ─── Page snapshots ─────────────────────────────────────────────────────────────
+@cached_per_user("snapshot")
+def get_dashboard_snapshot(user_id: int, recent: int = 5) -> dict:
+    """Everything the dashboard/profile header needs, read in one transaction.
+
+    All reads share one pooled connection and one snapshot of the DB, so the
+    count, averages and recent list always agree with each other. The parts
+    are read uncached – a cached list could predate the snapshot – and only
+    the finished snapshot is cached.
+    """
+    with transaction():
+        recent_essays, next_cursor = _list_user_essays(user_id, recent, None)
+        return {
+            "user": _get_user_by_id(user_id),
+            "essay_count": get_essay_count(user_id),
+            "averages": get_average_scores(user_id),
+            "recent_essays": recent_essays,
+            "next_cursor": next_cursor,     # continue the history with list_user_essays
+        }
+
+
+# ─── Tracing ────────────────────────────────────────────────────────────────────
+# With SMARTSCRIBE_TRACING=1 every public function above records a "db.<name>"
+# span; otherwise this leaves the module untouched.
+trace_functions(globals(), "db", skip=("connection", "transaction"))
+register_collector("read_cache", cache_stats)
@@ -0,0 +1,40 @@
+"""
+SmartScribe – Series downsampling
+Largest-Triangle-Three-Buckets (Steinarsson, 2013): picks `threshold` points
+of a series that keep its visual shape – peaks and dips survive where plain
+striding or averaging would flatten them.
+"""
+
+
+def lttb(xs, ys, threshold: int) -> list:
+    """Indices of the points to keep, first and last always included.
+
+    `xs` must be increasing numbers. Returns every index when the series is
+    already short enough.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        # The next bucket's centroid is the third corner of the triangle
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - end
+        avg_x = sum(xs[end:next_end]) / span
+        avg_y = sum(ys[end:next_end]) / span
+
+        ax, ay = xs[a], ys[a]
+        best_area, best = -1.0, start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area, best = area, j
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
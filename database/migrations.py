@@ -0,0 +1,508 @@
+"""
+SmartScribe – Schema migrations
+Ordered, versioned schema changes tracked with SQLite's ``PRAGMA user_version``.
+Append new steps to ``MIGRATIONS``; never edit or reorder a step that has shipped.
+"""
+
+import sqlite3
+
+from database.blobs import decode_body, encode_body
+
+
+# ─── Steps ──────────────────────────────────────────────────────────────────────
+def _create_base_tables(conn: sqlite3.Connection):
+    # IF NOT EXISTS: databases created before versioning already have these.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            username    TEXT    NOT NULL UNIQUE,
+            email       TEXT    NOT NULL UNIQUE,
+            password    TEXT    NOT NULL,
+            full_name   TEXT    DEFAULT '',
+            bio         TEXT    DEFAULT '',
+            avatar_url  TEXT    DEFAULT '',
+            created_at  TEXT    DEFAULT (datetime('now')),
+            updated_at  TEXT    DEFAULT (datetime('now'))
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS essays (
+            id              INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id         INTEGER NOT NULL,
+            title           TEXT    DEFAULT 'Untitled Essay',
+            content         TEXT    NOT NULL,
+            grammar_score   REAL    DEFAULT 0,
+            coherence_score REAL    DEFAULT 0,
+            argument_score  REAL    DEFAULT 0,
+            overall_score   REAL    DEFAULT 0,
+            feedback        TEXT    DEFAULT '',
+            submitted_at    TEXT    DEFAULT (datetime('now')),
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+
+
+def _create_user_stats(conn: sqlite3.Connection):
+    # Running per-user totals so dashboard stats read one row instead of
+    # aggregating every essay. Triggers keep it in step with `essays` inside the
+    # writer's own transaction.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id         INTEGER PRIMARY KEY,
+            essay_count     INTEGER NOT NULL DEFAULT 0,
+            grammar_sum     REAL    NOT NULL DEFAULT 0,
+            coherence_sum   REAL    NOT NULL DEFAULT 0,
+            argument_sum    REAL    NOT NULL DEFAULT 0,
+            overall_sum     REAL    NOT NULL DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    """)
+
+    add_scores = """
+        INSERT INTO user_stats
+            (user_id, essay_count, grammar_sum, coherence_sum, argument_sum, overall_sum)
+        VALUES (NEW.user_id, 1, IFNULL(NEW.grammar_score, 0), IFNULL(NEW.coherence_score, 0),
+                IFNULL(NEW.argument_score, 0), IFNULL(NEW.overall_score, 0))
+        ON CONFLICT (user_id) DO UPDATE SET
+            essay_count   = essay_count   + 1,
+            grammar_sum   = grammar_sum   + excluded.grammar_sum,
+            coherence_sum = coherence_sum + excluded.coherence_sum,
+            argument_sum  = argument_sum  + excluded.argument_sum,
+            overall_sum   = overall_sum   + excluded.overall_sum;
+    """
+    remove_scores = """
+        UPDATE user_stats SET
+            essay_count   = essay_count   - 1,
+            grammar_sum   = grammar_sum   - IFNULL(OLD.grammar_score, 0),
+            coherence_sum = coherence_sum - IFNULL(OLD.coherence_score, 0),
+            argument_sum  = argument_sum  - IFNULL(OLD.argument_score, 0),
+            overall_sum   = overall_sum   - IFNULL(OLD.overall_score, 0)
+        WHERE user_id = OLD.user_id;
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_stats_insert
+        AFTER INSERT ON essays BEGIN {add_scores} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_stats_delete
+        AFTER DELETE ON essays BEGIN {remove_scores} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_stats_update
+        AFTER UPDATE OF user_id, grammar_score, coherence_score, argument_score, overall_score
+        ON essays BEGIN {remove_scores} {add_scores} END
+    """)
+    rebuild_user_stats(conn)
+
+
+def rebuild_user_stats(conn: sqlite3.Connection) -> int:
+    """Recompute every user_stats row from `essays`; returns the number of users."""
+    conn.execute("DELETE FROM user_stats")
+    cur = conn.execute("""
+        INSERT INTO user_stats
+            (user_id, essay_count, grammar_sum, coherence_sum, argument_sum, overall_sum)
+        SELECT user_id, COUNT(*), TOTAL(grammar_score), TOTAL(coherence_score),
+               TOTAL(argument_score), TOTAL(overall_score)
+        FROM essays GROUP BY user_id
+    """)
+    return cur.rowcount
+
+
+def _create_essay_blobs(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS essay_blobs (
+            hash        TEXT    PRIMARY KEY,        -- sha256 of the UTF-8 body
+            codec       TEXT    NOT NULL,           -- 'zlib' or 'raw'
+            raw_size    INTEGER NOT NULL,
+            body        BLOB    NOT NULL
+        )
+    """)
+    conn.execute("ALTER TABLE essays ADD COLUMN blob_hash TEXT REFERENCES essay_blobs(hash)")
+    stats = move_bodies_to_blobs(conn)
+    return (f"moved {stats['essays']} bodies into {stats['new_blobs']} blobs, "
+            f"{stats['inline_bytes']} → {stats['stored_bytes']} bytes")
+
+
+def move_bodies_to_blobs(conn: sqlite3.Connection, batch_size: int = 500) -> dict:
+    """Move inline `essays.content` into deduplicated compressed blobs.
+
+    Returns counters for the space report: essays moved, new blobs written,
+    bytes held inline before and bytes stored in new blobs after.
+    """
+    stats = {"essays": 0, "new_blobs": 0, "inline_bytes": 0, "stored_bytes": 0}
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            "SELECT id, content FROM essays WHERE blob_hash IS NULL AND id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            return stats
+        for essay_id, content in rows:
+            digest, codec, raw_size, body = encode_body(content)
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO essay_blobs (hash, codec, raw_size, body) VALUES (?, ?, ?, ?)",
+                (digest, codec, raw_size, body),
+            )
+            if cur.rowcount:
+                stats["new_blobs"] += 1
+                stats["stored_bytes"] += len(body)
+            conn.execute("UPDATE essays SET blob_hash = ?, content = '' WHERE id = ?", (digest, essay_id))
+            stats["essays"] += 1
+            stats["inline_bytes"] += raw_size
+        last_id = rows[-1][0]
+
+
+def _create_essay_search(conn: sqlite3.Connection):
+    # External-content FTS5 over a view, so bodies aren't stored a second time;
+    # the view decompresses them through essay_body() (registered on every
+    # connection by database.blobs). `owner` holds a per-user token ("u42") so a
+    # user's search intersects posting lists instead of ranking everyone's hits.
+    conn.execute("""
+        CREATE VIEW IF NOT EXISTS essay_search_docs AS
+        SELECT e.id, e.title,
+               COALESCE(essay_body(b.codec, b.body), e.content) AS content,
+               e.feedback, 'u' || e.user_id AS owner
+        FROM essays e LEFT JOIN essay_blobs b ON b.hash = e.blob_hash
+    """)
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS essay_search USING fts5(
+            title, content, feedback, owner,
+            content = 'essay_search_docs', content_rowid = 'id',
+            prefix = '3 4',             -- prefix indexes keep type-ahead queries fast
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    """)
+
+    # The 'delete' command must be given exactly the values that were indexed
+    index_new = """
+        INSERT INTO essay_search (rowid, title, content, feedback, owner)
+        SELECT id, title, content, feedback, owner FROM essay_search_docs WHERE id = NEW.id;
+    """
+    unindex_old = """
+        INSERT INTO essay_search (essay_search, rowid, title, content, feedback, owner)
+        VALUES ('delete', OLD.id, OLD.title,
+                COALESCE((SELECT essay_body(codec, body) FROM essay_blobs WHERE hash = OLD.blob_hash),
+                         OLD.content),
+                OLD.feedback, 'u' || OLD.user_id);
+    """
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_search_insert
+        AFTER INSERT ON essays BEGIN {index_new} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_search_delete
+        AFTER DELETE ON essays BEGIN {unindex_old} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_search_update
+        AFTER UPDATE OF user_id, title, content, feedback, blob_hash
+        ON essays BEGIN {unindex_old} {index_new} END
+    """)
+    conn.execute("INSERT INTO essay_search (essay_search) VALUES ('rebuild')")
+    return f"indexed {conn.execute('SELECT COUNT(*) FROM essays').fetchone()[0]} essays"
+
+
+def _store_essay_search_text(conn: sqlite3.Connection):
+    # The search index keeps its own copy of the text, so nothing that writes
+    # `essays` needs essay_body(): the v15 full-text search triggers called it, and any
+    # connection without it (the sqlite3 shell, a backup script) failed every
+    # essay insert, update and delete. Triggers now index inline bodies and
+    # follow deletes and title/feedback/owner changes; blob-stored bodies are
+    # only plain text in Python, so the DB layer indexes those as it inserts them.
+    for trigger in ("insert", "delete", "update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_essays_search_{trigger}")
+    conn.execute("DROP TABLE IF EXISTS essay_search")
+    conn.execute("DROP VIEW IF EXISTS essay_search_docs")
+    conn.execute("""
+        CREATE VIRTUAL TABLE essay_search USING fts5(
+            title, content, feedback, owner,
+            prefix = '3 4',             -- prefix indexes keep type-ahead queries fast
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_search_insert
+        AFTER INSERT ON essays WHEN NEW.blob_hash IS NULL BEGIN
+            INSERT INTO essay_search (rowid, title, content, feedback, owner)
+            VALUES (NEW.id, NEW.title, NEW.content, NEW.feedback, 'u' || NEW.user_id);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_search_delete
+        AFTER DELETE ON essays BEGIN
+            DELETE FROM essay_search WHERE rowid = OLD.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_search_update
+        AFTER UPDATE OF user_id, title, feedback ON essays BEGIN
+            UPDATE essay_search SET title = NEW.title, feedback = NEW.feedback, owner = 'u' || NEW.user_id
+            WHERE rowid = NEW.id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_search_inline_body
+        AFTER UPDATE OF content ON essays WHEN NEW.blob_hash IS NULL BEGIN
+            UPDATE essay_search SET content = NEW.content WHERE rowid = NEW.id;
+        END
+    """)
+    return f"indexed {_index_all_essays(conn)} essays"
+
+
+def _contentless_essay_search(conn: sqlite3.Connection):
+    # The index stops keeping its own copy of every body and feedback – that
+    # copy undid the blob compression, at about five times the size of
+    # essay_blobs. Highlights and snippets are built from the decoded blob at
+    # query time instead (database.db.search_essays). With SQLite 3.43+ a
+    # contentless table can also drop rows, so deletes are followed by a
+    # trigger; on older builds a deleted essay's entry stays behind, unseen
+    # (searches join `essays`), until the next rebuild-search.
+    for trigger in ("insert", "delete", "update", "inline_body"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_essays_search_{trigger}")
+    conn.execute("DROP TABLE IF EXISTS essay_search")
+    can_delete = sqlite3.sqlite_version_info >= (3, 43, 0)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE essay_search USING fts5(
+            title, content, feedback, owner,
+            content = '', {"contentless_delete = 1," if can_delete else ""}
+            prefix = '3 4',             -- prefix indexes keep type-ahead queries fast
+            tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_essays_search_insert
+        AFTER INSERT ON essays WHEN NEW.blob_hash IS NULL BEGIN
+            INSERT INTO essay_search (rowid, title, content, feedback, owner)
+            VALUES (NEW.id, NEW.title, NEW.content, NEW.feedback, 'u' || NEW.user_id);
+        END
+    """)
+    if can_delete:
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_essays_search_delete
+            AFTER DELETE ON essays BEGIN
+                DELETE FROM essay_search WHERE rowid = OLD.id;
+            END
+        """)
+    return f"indexed {_index_all_essays(conn)} essays" + ("" if can_delete else "; deletes need rebuild-search")
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> int:
+    """Re-index every essay from scratch; returns the number indexed."""
+    conn.execute("INSERT INTO essay_search (essay_search) VALUES ('delete-all')")
+    return _index_all_essays(conn)
+
+
+def _index_all_essays(conn: sqlite3.Connection, batch_size: int = 500) -> int:
+    """Add every essay to an empty search index, decoding blob bodies in Python."""
+    indexed = last_id = 0
+    while True:
+        rows = conn.execute(
+            """SELECT e.id, e.title, e.content, e.feedback, e.user_id, b.codec, b.body
+               FROM essays e LEFT JOIN essay_blobs b ON b.hash = e.blob_hash
+               WHERE e.id > ? ORDER BY e.id LIMIT ?""",
+            (last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            return indexed
+        conn.executemany(
+            "INSERT INTO essay_search (rowid, title, content, feedback, owner) VALUES (?, ?, ?, ?, ?)",
+            [(essay_id, title, content if codec is None else decode_body(codec, body), feedback, f"u{user_id}")
+             for essay_id, title, content, feedback, user_id, codec, body in rows],
+        )
+        indexed += len(rows)
+        last_id = rows[-1][0]
+
+
+def _create_eval_cache_stats(conn: sqlite3.Connection):
+    # Running entry count and byte total of eval_cache, so a store checks its
+    # bounds by reading one row instead of scanning the cache (whose `size`
+    # sits behind the large `result` column). Triggers keep it in step inside
+    # the writer's own transaction, like user_stats.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS eval_cache_stats (
+            id          INTEGER PRIMARY KEY CHECK (id = 0),
+            entries     INTEGER NOT NULL,
+            bytes       INTEGER NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_eval_cache_stats_insert
+        AFTER INSERT ON eval_cache BEGIN
+            UPDATE eval_cache_stats SET entries = entries + 1, bytes = bytes + NEW.size;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_eval_cache_stats_delete
+        AFTER DELETE ON eval_cache BEGIN
+            UPDATE eval_cache_stats SET entries = entries - 1, bytes = bytes - OLD.size;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_eval_cache_stats_update
+        AFTER UPDATE OF size ON eval_cache BEGIN
+            UPDATE eval_cache_stats SET bytes = bytes - OLD.size + NEW.size;
+        END
+    """)
+    conn.execute("""
+        INSERT OR REPLACE INTO eval_cache_stats (id, entries, bytes)
+        SELECT 0, COUNT(*), IFNULL(SUM(size), 0) FROM eval_cache
+    """)
+
+
+# (description, step) – a step is one SQL statement or a callable taking the
+# connection; a callable may return a short note for the report. The schema
+# version after applying MIGRATIONS[i] is i + 1.
+MIGRATIONS = [
+    ("create users and essays tables", _create_base_tables),
+    (
+        "index essays by user and submission time",
+        # id breaks ties between essays submitted in the same second
+        """CREATE INDEX IF NOT EXISTS idx_essays_user_submitted
+           ON essays (user_id, submitted_at DESC, id DESC)""",
+    ),
+    (
+        "covering index for per-user score aggregates",
+        """CREATE INDEX IF NOT EXISTS idx_essays_user_scores
+           ON essays (user_id, grammar_score, coherence_score,
+                      argument_score, overall_score)""",
+    ),
+    ("per-user running essay stats maintained by triggers", _create_user_stats),
+    ("content-addressed compressed essay bodies", _create_essay_blobs),
+    (
+        "queue of essays waiting for background evaluation",
+        """CREATE TABLE IF NOT EXISTS jobs (
+               id           INTEGER PRIMARY KEY AUTOINCREMENT,
+               user_id      INTEGER NOT NULL,
+               title        TEXT    NOT NULL,
+               content      TEXT    NOT NULL,           -- cleared once the essay is saved
+               status       TEXT    NOT NULL DEFAULT 'queued',  -- queued|running|done|failed
+               attempts     INTEGER NOT NULL DEFAULT 0,
+               worker       TEXT    DEFAULT '',
+               essay_id     INTEGER,
+               result       TEXT    DEFAULT '',         -- evaluation result as JSON
+               error        TEXT    DEFAULT '',
+               created_at   TEXT    DEFAULT (datetime('now')),
+               started_at   TEXT,
+               finished_at  TEXT,
+               FOREIGN KEY (user_id)  REFERENCES users(id)  ON DELETE CASCADE,
+               FOREIGN KEY (essay_id) REFERENCES essays(id) ON DELETE SET NULL
+           )""",
+    ),
+    ("index jobs by status for claiming", "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)"),
+    (
+        "resume points for bulk ingestion runs",
+        """CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+               source      TEXT    PRIMARY KEY,     -- identifies the input file/directory
+               position    INTEGER NOT NULL,        -- input records fully committed
+               updated_at  TEXT    DEFAULT (datetime('now'))
+           )""",
+    ),
+    (
+        "evaluation result cache keyed by normalized content",
+        """CREATE TABLE IF NOT EXISTS eval_cache (
+               content_hash    TEXT    NOT NULL,    -- sha256 of the normalized essay
+               engine_version  TEXT    NOT NULL,
+               result          TEXT    NOT NULL,    -- evaluation result as JSON
+               size            INTEGER NOT NULL,    -- bytes of `result`, for the size bound
+               hits            INTEGER NOT NULL DEFAULT 0,
+               last_used_at    REAL    NOT NULL,    -- unix time; oldest is evicted first
+               PRIMARY KEY (content_hash, engine_version)
+           )""",
+    ),
+    ("index eval cache by recency for LRU eviction",
+     "CREATE INDEX IF NOT EXISTS idx_eval_cache_lru ON eval_cache (last_used_at)"),
+    (
+        "per-paragraph analyzer features stored with each essay",
+        """CREATE TABLE IF NOT EXISTS essay_paragraphs (
+               essay_id    INTEGER NOT NULL,
+               position    INTEGER NOT NULL,
+               para_hash   TEXT    NOT NULL,        -- normalized paragraph + engine version
+               features    TEXT    NOT NULL,        -- {analyzer: {feature: value}} as JSON
+               PRIMARY KEY (essay_id, position),
+               FOREIGN KEY (essay_id) REFERENCES essays(id) ON DELETE CASCADE
+           ) WITHOUT ROWID""",
+    ),
+    ("index essays by user and title to find the previous draft",
+     "CREATE INDEX IF NOT EXISTS idx_essays_user_title ON essays (user_id, title, submitted_at DESC)"),
+    ("partial results of running jobs",
+     "ALTER TABLE jobs ADD COLUMN progress TEXT DEFAULT ''"),
+    (
+        "covering index for per-user score history buckets",
+        """CREATE INDEX IF NOT EXISTS idx_essays_user_history
+           ON essays (user_id, submitted_at, overall_score, grammar_score,
+                      coherence_score, argument_score)""",
+    ),
+    ("full-text search over essay titles, bodies and feedback", _create_essay_search),
+    (
+        "minhash signature per essay",
+        """CREATE TABLE IF NOT EXISTS essay_minhash (
+               essay_id    INTEGER PRIMARY KEY,
+               signature   BLOB    NOT NULL,        -- NUM_PERM little-endian uint32 (database.minhash)
+               FOREIGN KEY (essay_id) REFERENCES essays(id) ON DELETE CASCADE
+           )""",
+    ),
+    (
+        "LSH band buckets for near-duplicate candidate lookup",
+        """CREATE TABLE IF NOT EXISTS essay_lsh (
+               band        INTEGER NOT NULL,
+               bucket      INTEGER NOT NULL,        -- 64-bit hash of the band's rows
+               essay_id    INTEGER NOT NULL,
+               PRIMARY KEY (band, bucket, essay_id),
+               FOREIGN KEY (essay_id) REFERENCES essays(id) ON DELETE CASCADE
+           ) WITHOUT ROWID""",
+    ),
+    ("index LSH buckets by essay for cascading deletes",
+     "CREATE INDEX IF NOT EXISTS idx_essay_lsh_essay ON essay_lsh (essay_id)"),
+    # Serves the FK action SQLite runs for every deleted essay,
+    # ``UPDATE jobs SET essay_id = NULL WHERE essay_id = ?`` – found by the slow-query log
+    ("index jobs by essay for ON DELETE SET NULL (was a full scan per deleted essay)",
+     "CREATE INDEX IF NOT EXISTS idx_jobs_essay ON jobs (essay_id) WHERE essay_id IS NOT NULL"),
+    ("running totals of the evaluation cache for its bounds", _create_eval_cache_stats),
+    ("search index keeps its own text; no SQL function needed to write essays", _store_essay_search_text),
+    ("index essays by blob for orphan cleanup and blob FK checks (were full scans of essays)",
+     "CREATE INDEX IF NOT EXISTS idx_essays_blob_hash ON essays (blob_hash)"),
+    ("contentless search index; snippets come from the compressed bodies", _contentless_essay_search),
+    ("drop the per-user score index: user_stats serves the aggregates it covered",
+     "DROP INDEX IF EXISTS idx_essays_user_scores"),
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+# ─── Runner ─────────────────────────────────────────────────────────────────────
+def current_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> list:
+    """Apply every pending step, each in its own transaction.
+
+    Returns the descriptions (plus any note) of the steps applied by this call.
+    Safe to run from several processes at once: the version is re-checked under
+    the write lock.
+    """
+    applied = []
+    for version, (description, step) in enumerate(MIGRATIONS, start=1):
+        if current_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) >= version:    # another process got here first
+                conn.rollback()
+                continue
+            note = None
+            if callable(step):
+                note = step(conn)
+            else:
+                conn.execute(step)
+            conn.execute(f"PRAGMA user_version = {version}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+        applied.append(f"{description} ({note})" if note else description)
+    if applied:
+        conn.execute("PRAGMA optimize")
+    return applied
@@ -0,0 +1,77 @@
+"""
+SmartScribe – MinHash signatures for near-duplicate detection
+Each essay is reduced to NUM_PERM minimum hashes over its word shingles; the
+fraction of equal positions between two signatures estimates the Jaccard
+similarity of their shingle sets. Signatures are split into BANDS bands of
+ROWS values and each band is hashed to a bucket: essays sharing any bucket are
+candidates (LSH), so a lookup is BANDS index seeks instead of a table scan.
+
+With 16 bands of 8 rows, pairs above ~0.7 similarity almost always share a
+bucket and pairs below ~0.4 almost never do.
+"""
+
+import hashlib
+import random
+import re
+import zlib
+
+SHINGLE_WORDS = 4
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+_PRIME = 4294967311                 # smallest prime above 2**32
+_rng = random.Random(20240611)      # fixed seed: signatures must be stable across releases
+_A = [_rng.randrange(1, 2 ** 31) for _ in range(NUM_PERM)]
+_B = [_rng.randrange(0, 2 ** 31) for _ in range(NUM_PERM)]
+_WORD_RE = re.compile(r"\w+")
+
+
+def _numpy():
+    """NumPy, imported on first signature rather than with the DB layer."""
+    import numpy
+
+    return numpy
+
+
+def shingles(text: str) -> set:
+    """crc32 of every run of SHINGLE_WORDS lower-cased words."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        return {zlib.crc32(" ".join(words).encode())} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_WORDS]).encode())
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def signature(text: str):
+    """Packed little-endian uint32 signature (NUM_PERM * 4 bytes), or None for empty text."""
+    hashes = shingles(text)
+    if not hashes:
+        return None
+    np = _numpy()
+    x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    a = np.array(_A, dtype=np.uint64)[:, None]
+    b = np.array(_B, dtype=np.uint64)[:, None]
+    # a < 2**31 and x < 2**32, so a*x + b fits in uint64 without wrapping
+    mins = ((a * x + b) % _PRIME).min(axis=1)
+    return (mins & 0xFFFFFFFF).astype("<u4").tobytes()
+
+
+def band_keys(sig: bytes) -> list:
+    """``(band, bucket)`` pairs for the LSH table; bucket is a signed 64-bit hash."""
+    width = ROWS * 4
+    return [
+        (band, int.from_bytes(hashlib.blake2b(sig[band * width:(band + 1) * width], digest_size=8).digest(),
+                              "little", signed=True))
+        for band in range(BANDS)
+    ]
+
+
+def similarity(sig_a: bytes, sig_b: bytes) -> float:
+    """Estimated Jaccard similarity of the two essays' shingle sets."""
+    np = _numpy()
+    a = np.frombuffer(sig_a, dtype="<u4")
+    b = np.frombuffer(sig_b, dtype="<u4")
+    return float(np.count_nonzero(a == b)) / NUM_PERM
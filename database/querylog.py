@@ -0,0 +1,253 @@
+"""
+SmartScribe – Slow-query log
+Connections opened with ``factory=TimedConnection`` time every statement,
+including the row fetches that follow it – SQLite does most of a SELECT's
+work while rows are stepped, not in execute(). Statements are grouped by
+shape (SQL with literals replaced and whitespace collapsed) for a top-N
+report. A statement whose time crosses SLOW_QUERY_MS is logged with its
+parameter shape (types and sizes, never values) and the EXPLAIN QUERY PLAN
+SQLite chose, so a full scan of `essays` shows up as ``SCAN essays``.
+
+Off unless SMARTSCRIBE_SLOW_QUERY_MS is set (0 logs every statement); a
+disabled DB layer opens plain sqlite3 connections and pays nothing.
+"""
+
+import functools
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+log = logging.getLogger("smartscribe.slowquery")
+
+_threshold = os.environ.get("SMARTSCRIBE_SLOW_QUERY_MS", "")
+ENABLED = _threshold != ""
+SLOW_QUERY_MS = float(_threshold or 100)
+PLAN_TTL_S = 60.0                   # re-capture a shape's plan at most this often
+RECENT_SLOW = 50                    # slow statements kept for the debug panel
+
+_lock = threading.Lock()
+_shapes = {}                        # shape -> [calls, total ms, max ms, slow calls]
+_plans = {}                         # shape -> (captured at, plan lines)
+_recent = deque(maxlen=RECENT_SLOW)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS_RE = re.compile(r"\(\?…\)(?:, \(\?…\))+")
+_SPACE_RE = re.compile(r"\s+")
+_SCAN_RE = re.compile(r"^SCAN (\w+)$")
+_EXPLAINABLE = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "REPLACE"})
+
+
+def configure(threshold_ms: float = None, enabled: bool = True):
+    """Switch the log on/off (e.g. from a benchmark); affects connections opened afterwards."""
+    global ENABLED, SLOW_QUERY_MS
+    ENABLED = enabled
+    if threshold_ms is not None:
+        SLOW_QUERY_MS = threshold_ms
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(sql: str) -> str:
+    """Collapse a statement to its shape: literals become ``?``, ``(?, ?, …)`` lists ``(?…)``."""
+    shape = _STRING_RE.sub("?", sql)
+    shape = _NUMBER_RE.sub("?", shape)
+    shape = _SPACE_RE.sub(" ", shape).strip()
+    return _ROWS_RE.sub("(?…), …", _LIST_RE.sub("(?…)", shape))
+
+
+def param_shape(params) -> str:
+    """Types (and str/bytes lengths) of the bound parameters – never their values."""
+    def one(value):
+        if isinstance(value, (str, bytes)):
+            return f"{type(value).__name__}[{len(value)}]"
+        return type(value).__name__
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {one(v)}" for k, v in params.items()) + "}"
+    return "(" + ", ".join(one(v) for v in params) + ")"
+
+
+def full_scans(plan: list) -> list:
+    """Tables the plan reads end to end without an index."""
+    return [m.group(1) for line in plan if (m := _SCAN_RE.match(line))]
+
+
+def _explain(conn: sqlite3.Connection, sql: str, params) -> list:
+    words = sql.split(None, 1)
+    if not words or words[0].upper() not in _EXPLAINABLE:
+        return []
+    try:
+        # Unbound by the timed wrappers, so the plan lookup isn't itself logged
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    except sqlite3.Error as exc:
+        return [f"(no plan: {exc})"]
+    return [row[3] for row in rows]
+
+
+def _plan_for(conn, shape: str, sql: str, params) -> list:
+    now = time.monotonic()
+    cached = _plans.get(shape)
+    if cached is not None and now - cached[0] < PLAN_TTL_S:
+        return cached[1]
+    plan = _explain(conn, sql, params)
+    _plans[shape] = (now, plan)
+    return plan
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that adds execute and fetch time to the statement's shape."""
+
+    _shape = None
+
+    def _begin(self, sql: str, params, runs: int = 1):
+        self._shape = normalize(sql)
+        self._sql, self._params, self._runs = sql, params, runs
+        self._ms, self._logged = 0.0, False
+        with _lock:
+            stats = _shapes.get(self._shape)
+            new = stats is None
+            if new:
+                stats = _shapes[self._shape] = [0, 0.0, 0.0, 0]
+            stats[0] += runs
+        if new:
+            # One plan per shape up front, so the report flags scans that are never slow yet
+            _plan_for(self.connection, self._shape, sql, params)
+
+    def _spent(self, started: float):
+        if self._shape is None:
+            return
+        elapsed = (time.perf_counter() - started) * 1000
+        self._ms += elapsed
+        with _lock:
+            stats = _shapes[self._shape]
+            stats[1] += elapsed
+            stats[2] = max(stats[2], self._ms)
+            slow = not self._logged and self._ms >= SLOW_QUERY_MS
+            if slow:
+                stats[3] += 1
+        if slow:
+            self._logged = True
+            self._report()
+
+    def _report(self):
+        plan = _plan_for(self.connection, self._shape, self._sql, self._params)
+        entry = {
+            "sql": self._shape,
+            "params": param_shape(self._params),
+            "runs": self._runs,
+            "ms": round(self._ms, 2),
+            "plan": plan,
+            "full_scans": full_scans(plan),
+            "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        with _lock:
+            _recent.append(entry)
+        log.warning(
+            "slow query %.1f ms%s: %s | params %s | plan: %s",
+            self._ms, f" ({self._runs} runs)" if self._runs > 1 else "", self._shape,
+            entry["params"], "; ".join(plan) or "n/a",
+        )
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._spent(started)
+
+    def executemany(self, sql, seq_of_parameters):
+        rows = seq_of_parameters if isinstance(seq_of_parameters, (list, tuple)) else list(seq_of_parameters)
+        self._begin(sql, rows[0] if rows else (), runs=len(rows))
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, rows)
+        finally:
+            self._spent(started)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._spent(started)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._spent(started)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._spent(started)
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            return super().__next__()
+        finally:
+            self._spent(started)
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose statements all run on TimedCursors."""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+# ─── Reports ────────────────────────────────────────────────────────────────────
+def top(limit: int = 10, by: str = "total_ms") -> list:
+    """The `limit` most expensive query shapes in this process."""
+    with _lock:
+        rows = [
+            {"sql": shape, "calls": calls, "total_ms": round(total, 1),
+             "mean_ms": round(total / calls, 3) if calls else 0.0, "max_ms": round(peak, 2), "slow": slow}
+            for shape, (calls, total, peak, slow) in _shapes.items()
+        ]
+    rows.sort(key=lambda r: r[by], reverse=True)
+    for row in rows[:limit]:
+        plan = _plans.get(row["sql"])
+        row["full_scans"] = full_scans(plan[1]) if plan else []
+    return rows[:limit]
+
+
+def recent_slow() -> list:
+    """The latest slow statements, newest first."""
+    with _lock:
+        return list(reversed(_recent))
+
+
+def format_report(limit: int = 10) -> str:
+    rows = top(limit)
+    if not rows:
+        return "No statements recorded."
+    lines = [f"{'total ms':>10} {'calls':>8} {'mean ms':>9} {'max ms':>9} {'slow':>5}  statement"]
+    for r in rows:
+        scans = f"  [SCAN {', '.join(r['full_scans'])}]" if r["full_scans"] else ""
+        sql = r["sql"] if len(r["sql"]) <= 110 else r["sql"][:109] + "…"
+        lines.append(f"{r['total_ms']:>10,.1f} {r['calls']:>8,} {r['mean_ms']:>9.3f} {r['max_ms']:>9.2f} "
+                     f"{r['slow']:>5}  {sql}{scans}")
+    return "\n".join(lines)
+
+
+def reset():
+    with _lock:
+        _shapes.clear()
+        _plans.clear()
+        _recent.clear()
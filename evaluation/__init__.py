@@ -0,0 +1,19 @@
+"""
+SmartScribe – Essay evaluation engine
+Offline, rule-based scoring of grammar, coherence and argument.
+
+The public names are resolved on first access, so ``from evaluation import
+cache`` (or merely importing a submodule) doesn't load the whole pipeline.
+"""
+
+import importlib
+
+__all__ = ["ENGINE_VERSION", "Pipeline", "evaluate_essay", "iter_evaluate_essay"]
+
+
+def __getattr__(name):
+    if name in __all__:
+        value = getattr(importlib.import_module("evaluation.pipeline"), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
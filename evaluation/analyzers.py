@@ -0,0 +1,281 @@
+"""
+SmartScribe – Essay analyzers
+Each analyzer scores one rubric dimension in two phases:
+
+* ``measure(paragraph)`` extracts additive numeric features from a single
+  paragraph – the expensive part, and independent of the other paragraphs;
+* ``score(features, doc)`` turns the features summed over all paragraphs into
+  a 0–10 score plus feedback messages.
+
+``cost`` is a rough relative price per paragraph; the pipeline runs cheap
+analyzers first.
+"""
+
+import re
+import zlib
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from evaluation.text import Document, Paragraph, content_words
+
+if TYPE_CHECKING:
+    import numpy
+
+MIN_WORDS = 150           # below this an essay can't fully develop an argument
+LONG_SENTENCE_WORDS = 40
+
+
+def _clamp(score: float) -> float:
+    return round(min(10.0, max(0.0, score)), 1)
+
+
+def _count_phrases(text: str, phrases) -> int:
+    return sum(text.count(p) for p in phrases)
+
+
+class Analyzer:
+    """Base class – subclasses set `name` and `cost` and implement both phases."""
+
+    name = ""
+    cost = 1
+
+    def measure(self, paragraph: Paragraph) -> dict:
+        raise NotImplementedError
+
+    def score(self, features: dict, doc: Document):
+        """Return ``(score, [feedback messages])``."""
+        raise NotImplementedError
+
+
+# ─── Grammar ────────────────────────────────────────────────────────────────────
+_MISSPELLINGS = {
+    "alot": "a lot", "arguement": "argument", "becuase": "because", "begining": "beginning",
+    "beleive": "believe", "calender": "calendar", "definately": "definitely",
+    "dissapoint": "disappoint", "enviroment": "environment", "existance": "existence",
+    "goverment": "government", "grammer": "grammar", "independant": "independent",
+    "occured": "occurred", "occurence": "occurrence", "persue": "pursue",
+    "posession": "possession", "recieve": "receive", "recieved": "received",
+    "reccomend": "recommend", "seperate": "separate", "succesful": "successful",
+    "tommorow": "tomorrow", "truely": "truly", "untill": "until", "wich": "which",
+    "wierd": "weird", "thier": "their", "acheive": "achieve", "neccessary": "necessary",
+    "publically": "publicly", "noticable": "noticeable", "concious": "conscious",
+    "goverments": "governments", "teh": "the", "freind": "friend", "basicly": "basically",
+}
+_REPEATED_WORD = re.compile(r"\b(\w+)\s+\1\b", re.IGNORECASE)
+_SPACE_BEFORE_PUNCT = re.compile(r"\s+[,.;:!?]")
+_NO_SPACE_AFTER_COMMA = re.compile(r",[A-Za-z]")
+_LOWER_I = re.compile(r"(?:^|\s)i(?:\s|'|$)")
+_A_BEFORE_VOWEL = re.compile(r"\ba\s+[aeio]\w*", re.IGNORECASE)
+_AN_BEFORE_CONSONANT = re.compile(r"\ban\s+(?![aeiouh])[a-z]\w*", re.IGNORECASE)
+
+
+class GrammarAnalyzer(Analyzer):
+    name = "grammar"
+    cost = 1
+
+    def measure(self, paragraph: Paragraph) -> dict:
+        text = paragraph.text
+        words = [w.lower() for ws in paragraph.words for w in ws]
+        sentences = paragraph.sentences
+        return {
+            "words": len(words),
+            "sentences": len(sentences),
+            "lowercase_starts": sum(1 for s in sentences if s[0].islower()),
+            "missing_end": 0 if not sentences or sentences[-1][-1] in ".!?\"'”’)" else 1,
+            "repeated_words": len(_REPEATED_WORD.findall(text)),
+            "spacing": len(_SPACE_BEFORE_PUNCT.findall(text)) + len(_NO_SPACE_AFTER_COMMA.findall(text)),
+            "lowercase_i": len(_LOWER_I.findall(text)),
+            "articles": len(_A_BEFORE_VOWEL.findall(text)) + len(_AN_BEFORE_CONSONANT.findall(text)),
+            "misspellings": sum(1 for w in words if w in _MISSPELLINGS),
+            "long_sentences": sum(1 for ws in paragraph.words if len(ws) > LONG_SENTENCE_WORDS),
+        }
+
+    def score(self, features: dict, doc: Document):
+        words = max(features.get("words", 0), 1)
+        checks = [
+            ("misspellings", 1.0, "Check spelling – {n} commonly misspelled word(s) found."),
+            ("lowercase_starts", 1.0, "Start every sentence with a capital letter ({n} don't)."),
+            ("missing_end", 1.0, "End each paragraph's last sentence with punctuation ({n} missing)."),
+            ("repeated_words", 1.0, "Remove accidentally repeated words ({n} found, e.g. 'the the')."),
+            ("lowercase_i", 1.0, "Capitalise the pronoun 'I' ({n} lower-case uses)."),
+            ("articles", 0.75, "Check 'a' vs 'an' before vowel sounds ({n} suspicious uses)."),
+            ("spacing", 0.5, "Fix spacing around punctuation ({n} issues)."),
+            ("long_sentences", 0.75, f"Split very long sentences (over {LONG_SENTENCE_WORDS} words; {{n}} found)."),
+        ]
+        errors = 0.0
+        notes = []
+        for key, weight, message in checks:
+            n = features.get(key, 0)
+            if n:
+                errors += weight * n
+                notes.append(message.format(n=n))
+        # ~1 weighted error per 100 words costs one point
+        score = _clamp(10 - 100 * errors / words)
+        if not notes:
+            notes.append("No mechanical errors detected – spelling and punctuation look clean.")
+        return score, notes
+
+
+# ─── Coherence ──────────────────────────────────────────────────────────────────
+_TRANSITIONS = (
+    "however", "therefore", "moreover", "furthermore", "in addition", "consequently",
+    "for example", "for instance", "as a result", "on the other hand", "in contrast",
+    "similarly", "likewise", "thus", "hence", "meanwhile", "finally", "first", "second",
+    "third", "next", "in conclusion", "additionally", "nevertheless", "instead",
+    "ultimately", "overall", "specifically", "in particular", "also",
+)
+_VECTOR_DIM = 256
+
+
+def _numpy():
+    """NumPy, imported on first use: the app process only looks results up and
+    should not pay ~80 ms at startup for a library only the scorer needs."""
+    import numpy
+
+    return numpy
+
+
+@lru_cache(maxsize=65536)
+def _bucket(word: str) -> int:
+    # crc32 rather than hash(): stable across processes, so scores are reproducible
+    return zlib.crc32(word.encode()) % _VECTOR_DIM
+
+
+def _sentence_vectors(paragraph: Paragraph) -> "numpy.ndarray":
+    """Unit-length hashed bag-of-content-words vector per sentence."""
+    np = _numpy()
+    vectors = np.zeros((len(paragraph.sentences), _VECTOR_DIM), dtype=np.float32)
+    for row, words in enumerate(paragraph.words):
+        buckets = [_bucket(w) for w in content_words(words)]
+        if buckets:
+            np.add.at(vectors[row], buckets, 1.0)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class CoherenceAnalyzer(Analyzer):
+    name = "coherence"
+    cost = 3
+
+    def measure(self, paragraph: Paragraph) -> dict:
+        np = _numpy()
+        lowered = [s.lower() for s in paragraph.sentences]
+        lengths = np.array([len(ws) for ws in paragraph.words], dtype=np.float64)
+        similarity = 0.0
+        if len(lowered) > 1:
+            vectors = _sentence_vectors(paragraph)
+            similarity = float(np.einsum("ij,ij->i", vectors[:-1], vectors[1:]).sum())
+        return {
+            "paragraphs": 1,
+            "sentences": len(lowered),
+            "single_sentence_paragraphs": 1 if len(lowered) == 1 else 0,
+            "transitions": sum(1 for s in lowered if any(s.startswith(t) or f", {t}" in s for t in _TRANSITIONS)),
+            "adjacent_pairs": max(len(lowered) - 1, 0),
+            "adjacent_similarity": similarity,
+            "length_sum": float(lengths.sum()),
+            "length_sq_sum": float((lengths ** 2).sum()),
+        }
+
+    def score(self, features: dict, doc: Document):
+        sentences = max(features.get("sentences", 0), 1)
+        paragraphs = features.get("paragraphs", 0)
+        pairs = features.get("adjacent_pairs", 0)
+        notes = []
+
+        # Lexical continuity between neighbouring sentences: ~0.15–0.45 reads well
+        continuity = features.get("adjacent_similarity", 0.0) / pairs if pairs else 0.0
+        continuity_pts = 3.0 * min(continuity / 0.15, 1.0)
+        if continuity > 0.6:
+            continuity_pts -= 1.0
+            notes.append("Neighbouring sentences repeat each other heavily – vary your wording.")
+        elif continuity < 0.08 and pairs:
+            notes.append("Sentences feel disconnected – carry key ideas from one sentence into the next.")
+
+        transition_rate = features.get("transitions", 0) / sentences
+        transition_pts = 3.0 * min(transition_rate / 0.25, 1.0)
+        if transition_rate < 0.1:
+            notes.append("Use more transitions (however, therefore, for example) to guide the reader.")
+
+        expected_paragraphs = min(5, max(1, doc.word_count // 120))
+        structure_pts = 2.0 * min(paragraphs / expected_paragraphs, 1.0)
+        if paragraphs < expected_paragraphs:
+            notes.append(f"Break the essay into more paragraphs – about {expected_paragraphs} suit this length.")
+        if features.get("single_sentence_paragraphs", 0) > 1:
+            structure_pts -= 0.5
+            notes.append("Develop one-sentence paragraphs into full paragraphs.")
+
+        mean = features.get("length_sum", 0.0) / sentences
+        variance = max(features.get("length_sq_sum", 0.0) / sentences - mean ** 2, 0.0)
+        variety_pts = 2.0 * min((variance ** 0.5) / 6.0, 1.0)
+        if variance ** 0.5 < 3 and sentences > 3:
+            notes.append("Vary sentence length to keep the rhythm engaging.")
+
+        if not notes:
+            notes.append("Ideas flow logically with clear transitions and paragraphing.")
+        return _clamp(continuity_pts + transition_pts + structure_pts + variety_pts), notes
+
+
+# ─── Argument ───────────────────────────────────────────────────────────────────
+_THESIS = ("i believe", "i argue", "this essay", "i will argue", "in my opinion", "i contend",
+           "should", "must", "it is clear that", "the main reason")
+_EVIDENCE = ("for example", "for instance", "according to", "research", "study", "studies",
+             "data", "evidence", "survey", "statistics", "percent", "%", "such as", "report")
+_REASONING = ("because", "therefore", "thus", "as a result", "consequently", "since",
+              "this means", "which shows", "hence", "so that", "due to")
+_COUNTER = ("however", "although", "on the other hand", "critics", "opponents", "some argue",
+            "some people", "while some", "admittedly", "despite", "nevertheless")
+_CONCLUSION = ("in conclusion", "to conclude", "to sum up", "in summary", "ultimately", "overall")
+_NUMBER = re.compile(r"\b\d+(?:[.,]\d+)?\b")
+
+
+class ArgumentAnalyzer(Analyzer):
+    name = "argument"
+    cost = 2
+
+    def measure(self, paragraph: Paragraph) -> dict:
+        text = paragraph.text.lower()
+        return {
+            "words": paragraph.word_count,
+            "thesis": _count_phrases(text, _THESIS),
+            "evidence": _count_phrases(text, _EVIDENCE) + len(_NUMBER.findall(text)),
+            "reasoning": _count_phrases(text, _REASONING),
+            "counter": _count_phrases(text, _COUNTER),
+            "conclusion": _count_phrases(text, _CONCLUSION),
+        }
+
+    def score(self, features: dict, doc: Document):
+        words = features.get("words", 0)
+        per_100 = 100 / max(words, 1)
+        notes = []
+
+        pts = 0.0
+        if features.get("thesis", 0):
+            pts += 2.0
+        else:
+            notes.append("State a clear thesis early (e.g. 'This essay argues that…').")
+        evidence_rate = features.get("evidence", 0) * per_100
+        pts += 3.0 * min(evidence_rate / 1.5, 1.0)
+        if evidence_rate < 0.5:
+            notes.append("Support claims with evidence – examples, data or cited sources.")
+        reasoning_rate = features.get("reasoning", 0) * per_100
+        pts += 2.0 * min(reasoning_rate / 1.0, 1.0)
+        if reasoning_rate < 0.4:
+            notes.append("Explain why your evidence supports the claim (because, therefore, as a result).")
+        if features.get("counter", 0):
+            pts += 1.5
+        else:
+            notes.append("Address a counter-argument to strengthen your position.")
+        if features.get("conclusion", 0):
+            pts += 1.5
+        else:
+            notes.append("Finish with a conclusion that restates and extends your thesis.")
+
+        if words < MIN_WORDS:
+            pts *= max(words, 1) / MIN_WORDS
+            notes.append(f"Develop the argument further – aim for at least {MIN_WORDS} words.")
+        if not notes:
+            notes.append("Well-supported argument with evidence, reasoning and a counter-argument.")
+        return _clamp(pts), notes
+
+
+DEFAULT_ANALYZERS = (GrammarAnalyzer, ArgumentAnalyzer, CoherenceAnalyzer)
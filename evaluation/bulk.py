@@ -0,0 +1,165 @@
+"""
+SmartScribe – Bulk essay ingestion
+Grades a whole cohort at once from a directory of ``.txt`` files or a JSONL file
+of ``{"username", "title", "content"}`` records.
+
+Run with:
+    python -m evaluation.bulk essays.jsonl
+    python -m evaluation.bulk ./cohort-a/ --username alice
+
+Input is streamed in batches, scored in parallel on all cores and written with
+batched inserts; each batch commits together with a checkpoint, so an
+interrupted run picks up where it stopped.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from database.db import (
+    get_ingest_checkpoint,
+    get_user_by_username,
+    init_db,
+    save_essays_bulk,
+    set_ingest_checkpoint,
+    transaction,
+)
+from evaluation.pipeline import evaluate_essay
+
+BATCH_SIZE = 1000
+
+
+# ─── Input readers ──────────────────────────────────────────────────────────────
+def iter_text_dir(path: Path, username: str):
+    """``(username, title, content)`` per ``*.txt`` file, in stable name order."""
+    for file in sorted(path.glob("*.txt")):
+        title = file.stem.replace("_", " ").strip() or "Untitled Essay"
+        yield username, title, file.read_text(encoding="utf-8", errors="replace")
+
+
+def iter_jsonl(path: Path):
+    """``(username, title, content)`` per line; malformed lines yield None."""
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+                yield rec["username"], rec.get("title") or "Untitled Essay", rec["content"]
+            except (ValueError, KeyError, TypeError):
+                yield None
+
+
+# ─── Scoring (runs in worker processes) ─────────────────────────────────────────
+def _score(content: str):
+    """The essay's score columns, or the reason it couldn't be scored (a str)."""
+    try:
+        result = evaluate_essay(content)
+    except ValueError as exc:           # the essay itself can't be scored
+        return str(exc) or "unscorable essay"
+    except Exception as exc:
+        # One malformed record must not abort the run and lose the batches in flight
+        return f"{type(exc).__name__}: {exc}"
+    scores = result["scores"]
+    return (scores.get("grammar", 0), scores.get("coherence", 0), scores.get("argument", 0),
+            result["overall"], result["feedback"])
+
+
+# ─── Driver ─────────────────────────────────────────────────────────────────────
+def ingest(records, source: str, processes: int = None, batch_size: int = BATCH_SIZE,
+           restart: bool = False, progress=None) -> dict:
+    """Score and store `records`, resuming from the checkpoint for `source`."""
+    start = 0 if restart else get_ingest_checkpoint(source)
+    records = islice(records, start, None)
+    stats = {"resumed_at": start, "saved": 0, "skipped_user": 0, "skipped_invalid": 0, "invalid_reasons": {}}
+    user_ids = {}
+
+    def user_id(username):
+        if username not in user_ids:
+            user = get_user_by_username(username)
+            user_ids[username] = user["id"] if user else None
+        return user_ids[username]
+
+    position = start
+    started = time.perf_counter()
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(processes, mp_context=ctx) as pool:
+        batch = list(islice(records, batch_size))
+        scored = pool.map(_score, [r[2] if r else "" for r in batch], chunksize=32)
+        while batch:
+            # Submit the next batch before writing this one so the pool stays busy
+            next_batch = list(islice(records, batch_size))
+            next_scored = pool.map(_score, [r[2] if r else "" for r in next_batch], chunksize=32)
+
+            rows = []
+            for record, result in zip(batch, scored):
+                if record is None or isinstance(result, str):
+                    reason = "malformed record" if record is None else result
+                    stats["skipped_invalid"] += 1
+                    stats["invalid_reasons"][reason] = stats["invalid_reasons"].get(reason, 0) + 1
+                    continue
+                uid = user_id(record[0])
+                if uid is None:
+                    stats["skipped_user"] += 1
+                    continue
+                rows.append((uid, record[1], record[2]) + result)
+
+            position += len(batch)
+            with transaction(immediate=True):
+                save_essays_bulk(rows)
+                set_ingest_checkpoint(source, position)
+            stats["saved"] += len(rows)
+            if progress:
+                progress(position, stats["saved"], time.perf_counter() - started)
+            batch, scored = next_batch, next_scored
+
+    elapsed = time.perf_counter() - started
+    stats["processed"] = position - start
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["essays_per_sec"] = round(stats["processed"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-evaluate essays from a directory or JSONL file.")
+    parser.add_argument("input", type=Path, help="directory of .txt files or a .jsonl file")
+    parser.add_argument("--username", help="owner of every essay in a .txt directory")
+    parser.add_argument("--processes", type=int, default=None, help="scoring processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="essays per transaction")
+    parser.add_argument("--restart", action="store_true", help="ignore the saved checkpoint")
+    args = parser.parse_args(argv)
+
+    path = args.input.resolve()
+    if path.is_dir():
+        if not args.username:
+            parser.error("--username is required for a directory of .txt files")
+        records, source = iter_text_dir(path, args.username), f"dir:{path}:{args.username}"
+    elif path.is_file():
+        records, source = iter_jsonl(path), f"jsonl:{path}"
+    else:
+        parser.error(f"{path} does not exist")
+
+    init_db()
+
+    def progress(position, saved, elapsed):
+        print(f"  {position:>9,} read · {saved:>9,} saved · {saved / elapsed:,.0f} essays/s",
+              file=sys.stderr, flush=True)
+
+    stats = ingest(records, source, args.processes, args.batch_size, args.restart, progress)
+    if stats["resumed_at"]:
+        print(f"Resumed after {stats['resumed_at']:,} records.")
+    print(f"Processed {stats['processed']:,} records in {stats['elapsed_s']}s "
+          f"({stats['essays_per_sec']:,} essays/s): {stats['saved']:,} saved, "
+          f"{stats['skipped_user']:,} unknown user, {stats['skipped_invalid']:,} invalid.")
+    for reason, count in sorted(stats["invalid_reasons"].items(), key=lambda kv: -kv[1]):
+        print(f"  {count:>9,} × {reason}")
+
+
+if __name__ == "__main__":
+    main()
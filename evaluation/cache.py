@@ -0,0 +1,68 @@
+"""
+SmartScribe – Evaluation result cache
+Resubmitting the same essay (even with different whitespace) is served from
+the `eval_cache` table instead of re-running the analyzers. Entries are keyed
+by the normalized text and ENGINE_VERSION, so a scoring change never serves
+stale results.
+
+Importing this module doesn't load the scoring pipeline; ENGINE_VERSION is
+looked up on first use, so the evaluate page can check the cache cheaply.
+"""
+
+import hashlib
+import threading
+import unicodedata
+
+from database.db import get_cached_evaluation, put_cached_evaluation
+from evaluation.text import split_paragraphs
+from telemetry.tracing import register_collector
+
+CACHE_MAX_ENTRIES = 50_000
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def normalize(content: str) -> str:
+    """Canonical form: NFC, one space between words, blank line between paragraphs.
+
+    Only differences the analyzers ignore are removed, so a cached score is
+    the score the essay would get anyway.
+    """
+    content = unicodedata.normalize("NFC", content)
+    return "\n\n".join(" ".join(p.split()) for p in split_paragraphs(content))
+
+
+def content_key(content: str) -> str:
+    return hashlib.sha256(normalize(content).encode("utf-8")).hexdigest()
+
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def lookup(content: str):
+    """The cached result for `content`, or None."""
+    from evaluation.pipeline import ENGINE_VERSION
+    result = get_cached_evaluation(content_key(content), ENGINE_VERSION)
+    _count("hits" if result is not None else "misses")
+    return result
+
+
+def store(content: str, result: dict):
+    from evaluation.pipeline import ENGINE_VERSION
+    put_cached_evaluation(content_key(content), ENGINE_VERSION, result,
+                          CACHE_MAX_ENTRIES, CACHE_MAX_BYTES)
+
+
+def stats() -> dict:
+    """Process-wide hit/miss counters since start-up."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": round(hits / total, 3) if total else 0.0}
+
+
+register_collector("eval_cache", stats)
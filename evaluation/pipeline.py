@@ -0,0 +1,127 @@
+"""
+SmartScribe – Evaluation pipeline
+Runs the analyzers over a parsed essay and assembles the scores and feedback
+that `save_essay` persists.
+
+Analyzer measurements are per paragraph, so a revised draft only re-measures
+the paragraphs that changed; the rest are taken from the previous version.
+"""
+
+import hashlib
+
+from evaluation.analyzers import DEFAULT_ANALYZERS
+from evaluation.text import Document
+
+ENGINE_VERSION = "1.1"          # bump whenever scoring changes
+
+
+def paragraph_key(text: str) -> str:
+    """Identity of a paragraph's measurements: its normalized text + engine version."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{ENGINE_VERSION}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def sum_features(feature_dicts) -> dict:
+    """Add per-paragraph feature dicts key by key."""
+    total = {}
+    for features in feature_dicts:
+        for key, value in features.items():
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def format_feedback(notes) -> str:
+    """Render structured notes as the markdown bullet list stored with an essay."""
+    return "\n".join(f"- **{n['dimension'].title()}** – {n['message']}" for n in notes)
+
+
+class Pipeline:
+    """An ordered set of analyzers; cheaper analyzers always run first."""
+
+    def __init__(self, analyzers=None):
+        if analyzers is None:
+            analyzers = [cls() for cls in DEFAULT_ANALYZERS]
+        self.analyzers = sorted(analyzers, key=lambda a: a.cost)
+
+    def evaluate(self, content: str, previous: dict = None) -> dict:
+        """Score an essay.
+
+        `previous` maps paragraph keys to stored features (see
+        `get_paragraph_features`); matching paragraphs are not re-measured.
+
+        Returns ``{"scores": {dimension: 0–10}, "overall", "feedback", "notes",
+        "paragraphs", "reused_paragraphs", "engine_version"}``; `notes` is the
+        structured form of `feedback` and `paragraphs` the per-paragraph
+        ``{"hash", "features"}`` list to persist with the essay.
+        """
+        for event in self.iter_evaluate(content, previous):
+            if event["type"] == "result":
+                return event["result"]
+
+    def iter_evaluate(self, content: str, previous: dict = None):
+        """Generator form of `evaluate` that reports progress as it goes.
+
+        Yields, in order of completion:
+
+        * ``{"type": "paragraph", "dimension", "index", "total", "reused",
+          "step", "steps"}`` after each paragraph is measured for a dimension
+          (`step` of `steps` counts across all dimensions);
+        * ``{"type": "dimension", "dimension", "score", "notes"}`` once a
+          dimension is scored – cheapest analyzers first;
+        * ``{"type": "result", "result"}`` last, with what `evaluate` returns.
+        """
+        doc = Document(content)
+        if doc.word_count == 0:
+            raise ValueError("Essay has no words to evaluate.")
+
+        previous = previous or {}
+        keys = [paragraph_key(p.text) for p in doc.paragraphs]
+        known = [previous.get(k) for k in keys]
+        measured = [dict(k) if k else {} for k in known]
+        total = len(doc.paragraphs)
+
+        steps = total * len(self.analyzers)
+
+        scores, notes = {}, []
+        for position, analyzer in enumerate(self.analyzers):
+            for index, (paragraph, features) in enumerate(zip(doc.paragraphs, measured)):
+                reused = analyzer.name in features
+                if not reused:
+                    features[analyzer.name] = analyzer.measure(paragraph)
+                yield {"type": "paragraph", "dimension": analyzer.name, "index": index,
+                       "total": total, "reused": reused,
+                       "step": position * total + index + 1, "steps": steps}
+            totals = sum_features(f[analyzer.name] for f in measured)
+            score, messages = analyzer.score(totals, doc)
+            scores[analyzer.name] = score
+            notes.extend({"dimension": analyzer.name, "message": m} for m in messages)
+            yield {"type": "dimension", "dimension": analyzer.name, "score": score, "notes": messages}
+
+        yield {"type": "result", "result": {
+            "scores": scores,
+            "overall": round(sum(scores.values()) / len(scores), 1),
+            "feedback": format_feedback(notes),
+            "notes": notes,
+            "paragraphs": [{"hash": k, "features": f} for k, f in zip(keys, measured)],
+            "reused_paragraphs": sum(1 for k in known if k),
+            "engine_version": ENGINE_VERSION,
+        }}
+
+
+_default_pipeline = None
+
+
+def evaluate_essay(content: str, previous: dict = None) -> dict:
+    """Score `content` with the default analyzer pipeline."""
+    global _default_pipeline
+    if _default_pipeline is None:
+        _default_pipeline = Pipeline()
+    return _default_pipeline.evaluate(content, previous)
+
+
+def iter_evaluate_essay(content: str, previous: dict = None):
+    """Streaming variant of `evaluate_essay`; see `Pipeline.iter_evaluate`."""
+    global _default_pipeline
+    if _default_pipeline is None:
+        _default_pipeline = Pipeline()
+    return _default_pipeline.iter_evaluate(content, previous)
@@ -0,0 +1,65 @@
+"""
+SmartScribe – Text segmentation
+Splits an essay into paragraphs, sentences and words for the analyzers.
+Deliberately rule-based: fast, deterministic and free of model downloads.
+"""
+
+import re
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+(?=[\"'“‘(\[]?[A-Za-z0-9])")
+_WORD = re.compile(r"[A-Za-z]+(?:'[A-Za-z]+)?")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for
+from further had has have having he her here hers herself him himself his how i if in
+into is it its itself just me more most my myself no nor not now of off on once only
+or other our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under
+until up very was we were what when where which while who whom why will with would
+you your yours yourself yourselves
+""".split())
+
+
+class Paragraph:
+    """One paragraph with its sentences and per-sentence word lists."""
+
+    __slots__ = ("text", "sentences", "words")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.sentences = [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+        self.words = [_WORD.findall(s) for s in self.sentences]
+
+    @property
+    def word_count(self) -> int:
+        return sum(len(w) for w in self.words)
+
+
+class Document:
+    """A parsed essay: an ordered list of non-empty paragraphs."""
+
+    __slots__ = ("text", "paragraphs")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.paragraphs = [Paragraph(p.strip()) for p in split_paragraphs(text)]
+
+    @property
+    def word_count(self) -> int:
+        return sum(p.word_count for p in self.paragraphs)
+
+    @property
+    def sentence_count(self) -> int:
+        return sum(len(p.sentences) for p in self.paragraphs)
+
+
+def split_paragraphs(text: str) -> list:
+    """Paragraphs are separated by blank lines; empty ones are dropped."""
+    return [p for p in _PARAGRAPH_BREAK.split(text.replace("\r\n", "\n")) if p.strip()]
+
+
+def content_words(words) -> list:
+    """Lower-cased words with stopwords and very short tokens removed."""
+    return [w for w in (w.lower() for w in words) if len(w) > 2 and w not in STOPWORDS]
@@ -0,0 +1,210 @@
+"""
+SmartScribe – Background evaluation worker
+Claims queued jobs from the `jobs` table, scores them on a process pool and
+saves the results through the DB layer.
+
+Run stand-alone with:  python -m evaluation.worker [--processes N]
+or embedded in the Streamlit server via ``start_background_worker()``.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from database.db import (
+    claim_jobs,
+    complete_job,
+    fail_job,
+    get_paragraph_features,
+    init_db,
+    requeue_stale_jobs,
+    update_job_progress,
+)
+from evaluation import cache
+from evaluation.pipeline import iter_evaluate_essay
+from telemetry import tracing
+
+log = logging.getLogger("smartscribe.worker")
+
+POLL_INTERVAL_S = 0.25
+# Partial results are only published for essays that take a while to score,
+# and then at most every PROGRESS_INTERVAL_S – quick essays never pay for it.
+PROGRESS_DELAY_S = 0.1
+PROGRESS_INTERVAL_S = 0.1
+MAX_BACKOFF_S = 10.0                # longest pause after repeated loop failures
+
+
+def evaluate_job(job_id: int, content: str, previous: dict = None) -> dict:
+    """Score one job in a pool process, streaming partial results to its row."""
+    progress = {"steps_done": 0, "steps_total": 0, "dimensions": {}}
+    started = time.perf_counter()
+    last_write = 0.0
+    publish = True
+    for event in iter_evaluate_essay(content, previous):
+        kind = event["type"]
+        if kind == "result":
+            return event["result"]
+        if kind == "paragraph":
+            progress["steps_done"], progress["steps_total"] = event["step"], event["steps"]
+        else:
+            progress["dimensions"][event["dimension"]] = {"score": event["score"], "notes": event["notes"]}
+
+        now = time.perf_counter()
+        if publish and now - started >= PROGRESS_DELAY_S and (
+            kind == "dimension" or now - last_write >= PROGRESS_INTERVAL_S
+        ):
+            try:
+                update_job_progress(job_id, progress)
+            except sqlite3.Error as exc:    # progress is best-effort; the score is what matters
+                log.warning("job %d: stopped publishing progress: %s", job_id, exc)
+                publish = False
+            last_write = now
+
+
+class EvaluationWorker:
+    """Dispatch loop feeding queued jobs to a pool of scoring processes."""
+
+    def __init__(self, processes: int = None, poll_interval: float = POLL_INTERVAL_S, metrics_role: str = None):
+        self.processes = processes or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        # Set only for a stand-alone worker process; embedded in the Streamlit
+        # server, the server's own export already covers the worker's metrics.
+        self.metrics_role = metrics_role
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._thread = None                 # set when started on a background thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: never fork a multi-threaded Streamlit server
+        return ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        pool = self._new_pool()
+        in_flight = {}                      # future -> (claimed job, submitted at)
+        # Claimed by this worker but neither in the pool nor recorded as done or
+        # failed – an iteration that raises hands these back to the queue.
+        unfinished = set()
+        interrupted_by = None
+        recovered = False
+        failures = 0
+        try:
+            while not self._stop.is_set():
+                try:
+                    if not recovered:
+                        requeued = requeue_stale_jobs()
+                        if requeued:
+                            log.info("re-queued %d stale jobs", requeued)
+                        recovered = True
+                    for job_id in list(unfinished):
+                        fail_job(job_id, f"evaluation interrupted: {interrupted_by}")
+                        unfinished.discard(job_id)
+                    pool = self._step(pool, in_flight, unfinished)
+                    failures = 0
+                except Exception as exc:
+                    # A locked or unavailable database must not kill the thread:
+                    # nothing restarts it, and the queue would stall for good.
+                    failures += 1
+                    interrupted_by = f"{type(exc).__name__}: {exc}"
+                    delay = min(self.poll_interval * 2 ** failures, MAX_BACKOFF_S)
+                    log.exception("worker iteration failed; retrying in %.1f s", delay)
+                    self._stop.wait(delay)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _step(self, pool: ProcessPoolExecutor, in_flight: dict, unfinished: set) -> ProcessPoolExecutor:
+        """One pass of the dispatch loop; returns the pool to use next."""
+        if self.metrics_role:
+            tracing.maybe_export(self.metrics_role)
+        free = self.processes - len(in_flight)
+        if free > 0:
+            claimed = claim_jobs(self.name, limit=free)
+            unfinished.update(job["id"] for job in claimed)
+            for job in claimed:
+                cached = cache.lookup(job["content"])
+                if cached is not None:
+                    complete_job(job["id"], cached)
+                    unfinished.discard(job["id"])
+                    continue
+                # A revised draft reuses the unchanged paragraphs of the last one
+                previous = get_paragraph_features(job["user_id"], job["title"])
+                future = pool.submit(evaluate_job, job["id"], cache.normalize(job["content"]), previous)
+                in_flight[future] = (job, time.perf_counter())
+                unfinished.discard(job["id"])
+        if not in_flight:
+            self._stop.wait(self.poll_interval)
+            return pool
+        done, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+        broken = False
+        for future in done:
+            job, submitted = in_flight.pop(future)
+            job_id = job["id"]
+            unfinished.add(job_id)
+            try:
+                result = future.result()
+                tracing.observe("worker.score", (time.perf_counter() - submitted) * 1000)
+                cache.store(job["content"], result)
+                complete_job(job_id, result)
+            except BrokenProcessPool as exc:
+                log.error("scoring process died on job %d: %s", job_id, exc)
+                fail_job(job_id, f"worker process died: {exc}")
+                broken = True
+            except ValueError as exc:       # the essay itself can't be scored
+                log.warning("job %d rejected: %s", job_id, exc)
+                fail_job(job_id, str(exc), retry=False)
+            except sqlite3.Error:
+                raise                       # the score is fine, the database isn't: retry the job
+            except Exception as exc:
+                log.exception("job %d failed", job_id)
+                fail_job(job_id, f"{type(exc).__name__}: {exc}")
+            unfinished.discard(job_id)
+        if broken:
+            # every other in-flight future is lost with the pool
+            lost = [job["id"] for job, _ in in_flight.values()]
+            unfinished.update(lost)
+            in_flight.clear()
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = self._new_pool()
+            for job_id in lost:
+                fail_job(job_id, "worker process pool restarted")
+                unfinished.discard(job_id)
+        return pool
+
+
+def start_background_worker(processes: int = None) -> EvaluationWorker:
+    """Run a worker on a daemon thread of the current process."""
+    worker = EvaluationWorker(processes)
+    worker._thread = threading.Thread(target=worker.run, name="smartscribe-worker", daemon=True)
+    worker._thread.start()
+    return worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SmartScribe background evaluation worker")
+    parser.add_argument("--processes", type=int, default=None, help="scoring processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    init_db()
+    worker = EvaluationWorker(args.processes, metrics_role="worker")
+    log.info("worker %s running with %d processes", worker.name, worker.processes)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        log.info("worker stopped")
+
+
+if __name__ == "__main__":
+    main()
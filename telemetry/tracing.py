@@ -0,0 +1,247 @@
+"""
+SmartScribe – Tracing and metrics
+Timing spans for the hot paths (DB calls, bcrypt, page renders), folded into
+per-process counters and latency histograms. While a rerun is being traced
+the spans are also kept in order, so the debug panel can show where that
+rerun's time went.
+
+Off unless SMARTSCRIBE_TRACING=1. The switch is read at import: `traced`
+then hands back the undecorated function and `span` a shared no-op, so a
+disabled build pays nothing on the decorated paths.
+
+With SMARTSCRIBE_METRICS_FILE set, each process also writes its metrics in
+Prometheus text format at most every EXPORT_INTERVAL_S – point node_exporter's
+textfile collector at it. ``{role}`` and ``{pid}`` in the path are filled in,
+so the server and an external worker don't overwrite each other.
+"""
+
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+import types
+
+ENABLED = os.environ.get("SMARTSCRIBE_TRACING", "") == "1"
+METRICS_FILE = os.environ.get("SMARTSCRIBE_METRICS_FILE", "")
+EXPORT_INTERVAL_S = 15.0
+
+# Histogram bucket upper bounds (ms); a last, implicit bucket catches the rest.
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+MAX_RERUN_SPANS = 500               # a runaway loop can't grow a rerun's trace without bound
+
+_lock = threading.Lock()
+_histograms = {}                    # span name -> [bucket counts..., total ms, count]
+_counters = {}                      # (name, span) -> int
+_collectors = {}                    # prefix -> fn() -> {metric: number}
+_local = threading.local()          # the current thread's rerun trace, if any
+_started_at = time.time()
+_last_export = {}                   # role -> monotonic time of its last write
+
+_NOOP = contextlib.nullcontext()
+
+
+# ─── Recording ──────────────────────────────────────────────────────────────────
+def observe(name: str, elapsed_ms: float, error: bool = False):
+    """Add one timing to the `name` histogram."""
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = [0] * (len(BUCKETS_MS) + 3)
+        hist[bisect.bisect_left(BUCKETS_MS, elapsed_ms)] += 1
+        hist[-2] += elapsed_ms
+        hist[-1] += 1
+        if error:
+            _counters[("span_errors", name)] = _counters.get(("span_errors", name), 0) + 1
+
+
+def increment(name: str, amount: int = 1):
+    """Bump a per-process counter (exported as ``smartscribe_<name>_total``)."""
+    with _lock:
+        _counters[(name, None)] = _counters.get((name, None), 0) + amount
+
+
+class _Span:
+    __slots__ = ("name", "_start", "_record")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        spans = getattr(_local, "spans", None)
+        if spans is not None and len(spans) < MAX_RERUN_SPANS:
+            # name, depth, offset into the rerun (ms), duration (ms)
+            self._record = [self.name, _local.depth, 0.0, 0.0]
+            spans.append(self._record)
+            _local.depth += 1
+        else:
+            self._record = None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = (time.perf_counter() - self._start) * 1000
+        if self._record is not None:
+            self._record[2] = (self._start - _local.rerun_start) * 1000
+            self._record[3] = elapsed
+            _local.depth -= 1
+        # st.rerun() and st.stop() unwind with BaseExceptions – those aren't failures
+        observe(self.name, elapsed, error=exc_type is not None and issubclass(exc_type, Exception))
+        return False
+
+
+def span(name: str):
+    """Context manager timing the block under `name`."""
+    return _Span(name) if ENABLED else _NOOP
+
+
+def traced(name: str):
+    """Decorator timing every call under `name`; a no-op when tracing is off."""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_functions(namespace: dict, prefix: str, skip=()):
+    """Trace every public function defined in a module as ``<prefix>.<name>``.
+
+    Call it at the bottom of the module, with ``globals()``, so later
+    ``from module import fn`` picks up the traced versions.
+    """
+    if not ENABLED:
+        return
+    module = namespace["__name__"]
+    for name, fn in list(namespace.items()):
+        if (isinstance(fn, types.FunctionType) and fn.__module__ == module
+                and not name.startswith("_") and name not in skip):
+            namespace[name] = traced(f"{prefix}.{name}")(fn)
+
+
+def register_collector(prefix: str, collect):
+    """Export ``collect()``'s numbers as ``smartscribe_<prefix>_<key>`` gauges."""
+    _collectors[prefix] = collect
+
+
+# ─── Per-rerun traces ───────────────────────────────────────────────────────────
+def begin_rerun():
+    """Start keeping this thread's spans in order (called at the top of app.py)."""
+    if not ENABLED:
+        return
+    _local.spans = []
+    _local.depth = 0
+    _local.rerun_start = time.perf_counter()
+    increment("reruns")
+
+
+def end_rerun() -> list:
+    """Stop tracing the rerun; returns its ``[name, depth, offset_ms, ms]`` spans."""
+    spans = getattr(_local, "spans", None)
+    if not ENABLED or spans is None:
+        return []
+    observe("rerun", (time.perf_counter() - _local.rerun_start) * 1000)
+    _local.spans = None
+    return spans
+
+
+# ─── Reading and export ─────────────────────────────────────────────────────────
+def _upper_bound(buckets, count: int, q: float) -> float:
+    """Bucket bound under which a `q` fraction of the observations fall."""
+    seen = 0
+    for bound, n in zip(BUCKETS_MS + (float("inf"),), buckets):
+        seen += n
+        if seen >= q * count:
+            return bound
+    return float("inf")
+
+
+def summary() -> list:
+    """Per-span calls, mean and bucketed p95 (ms), most total time first."""
+    with _lock:
+        hists = {name: list(h) for name, h in _histograms.items()}
+        errors = {name: n for (kind, name), n in _counters.items() if kind == "span_errors"}
+    rows = [
+        {
+            "span": name,
+            "calls": h[-1],
+            "total_ms": round(h[-2], 1),
+            "mean_ms": round(h[-2] / h[-1], 2),
+            "p95_ms": _upper_bound(h[:-2], h[-1], 0.95),
+            "errors": errors.get(name, 0),
+        }
+        for name, h in hists.items()
+    ]
+    return sorted(rows, key=lambda r: r["total_ms"], reverse=True)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    """All metrics of this process in Prometheus text exposition format."""
+    with _lock:
+        hists = {name: list(h) for name, h in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = [
+        "# HELP smartscribe_span_duration_seconds Time spent in traced code paths.",
+        "# TYPE smartscribe_span_duration_seconds histogram",
+    ]
+    for name, h in sorted(hists.items()):
+        label = f'span="{_label(name)}"'
+        cumulative = 0
+        for bound, n in zip(BUCKETS_MS, h):
+            cumulative += n
+            lines.append(f'smartscribe_span_duration_seconds_bucket{{{label},le="{bound / 1000:g}"}} {cumulative}')
+        lines.append(f'smartscribe_span_duration_seconds_bucket{{{label},le="+Inf"}} {h[-1]}')
+        lines.append(f"smartscribe_span_duration_seconds_sum{{{label}}} {h[-2] / 1000:.6f}")
+        lines.append(f"smartscribe_span_duration_seconds_count{{{label}}} {h[-1]}")
+
+    lines += ["# HELP smartscribe_span_errors_total Traced calls that raised.",
+              "# TYPE smartscribe_span_errors_total counter"]
+    for (kind, name), n in sorted(counters.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+        if kind == "span_errors":
+            lines.append(f'smartscribe_span_errors_total{{span="{_label(name)}"}} {n}')
+    for (kind, name), n in sorted(counters.items(), key=lambda kv: kv[0][0]):
+        if name is None:
+            lines += [f"# TYPE smartscribe_{kind}_total counter", f"smartscribe_{kind}_total {n}"]
+
+    for prefix, collect in sorted(_collectors.items()):
+        for key, value in collect().items():
+            if isinstance(value, (int, float)):
+                lines += [f"# TYPE smartscribe_{prefix}_{key} gauge", f"smartscribe_{prefix}_{key} {value}"]
+
+    lines += ["# TYPE smartscribe_process_start_time_seconds gauge",
+              f"smartscribe_process_start_time_seconds {_started_at:.3f}"]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path: str):
+    """Write the metrics atomically, so a scraper never reads half a file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(prometheus_text())
+    os.replace(tmp, path)
+
+
+def maybe_export(role: str):
+    """Refresh SMARTSCRIBE_METRICS_FILE if it is due; cheap to call every loop.
+
+    A process exports under one role – the registry is process-wide, so a
+    second role would only write the same series to another file.
+    """
+    if not ENABLED or not METRICS_FILE:
+        return
+    now = time.monotonic()
+    if now - _last_export.get(role, float("-inf")) < EXPORT_INTERVAL_S:
+        return
+    _last_export[role] = now
+    write_prometheus(METRICS_FILE.format(role=role, pid=os.getpid()))
@@ -0,0 +1,14 @@
+import pytest
+
+from database import cache, db
+
+
+@pytest.fixture
+def fresh_db(tmp_path, monkeypatch):
+    """The DB layer pointed at an empty, migrated database of its own."""
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "smartscribe.db"))
+    cache.clear()
+    db.init_db()
+    yield db
+    db.close_all_connections()
+    cache.clear()
@@ -0,0 +1,22 @@
+import sqlite3
+
+
+def test_snapshot_ignores_cached_reads_from_before_it(fresh_db):
+    db = fresh_db
+    user_id = db.create_user("ada", "ada@example.com", "x")
+    db.save_essay(user_id, "First", "One essay body.", overall=6)
+    db.list_user_essays(user_id, limit=5)           # warm the per-user read cache
+    db.get_user_by_id(user_id)
+
+    # Another process (the external worker) writes without invalidating this one's cache
+    other = sqlite3.connect(db.DB_PATH)
+    other.execute("INSERT INTO essays (user_id, title, content, overall_score) VALUES (?, 'Second', 'x', 8)",
+                  (user_id,))
+    other.execute("UPDATE users SET full_name = 'Ada L.' WHERE id = ?", (user_id,))
+    other.commit()
+    other.close()
+
+    snap = db.get_dashboard_snapshot(user_id)
+    assert snap["essay_count"] == len(snap["recent_essays"]) == 2
+    assert snap["averages"]["avg_overall"] == 7.0
+    assert snap["user"]["full_name"] == "Ada L."
@@ -0,0 +1,27 @@
+import math
+
+import pytest
+
+from database.downsample import lttb
+
+
+@pytest.mark.parametrize("n, threshold", [(10, 3), (100, 7), (1000, 200), (201, 200), (5000, 64)])
+def test_keeps_endpoints_and_threshold(n, threshold):
+    xs = list(range(n))
+    ys = [math.sin(x / 7) for x in xs]
+    kept = lttb(xs, ys, threshold)
+    assert len(kept) == threshold
+    assert kept[0] == 0 and kept[-1] == n - 1
+    assert kept == sorted(set(kept))                # increasing, no repeats
+
+
+def test_short_series_is_returned_whole():
+    assert lttb([1, 2, 3], [5, 6, 7], 10) == [0, 1, 2]
+    assert lttb([1, 2, 3, 4], [5, 6, 7, 8], 2) == [0, 1, 2, 3]
+
+
+def test_keeps_a_lone_spike():
+    xs = list(range(500))
+    ys = [0.0] * 500
+    ys[317] = 10.0
+    assert 317 in lttb(xs, ys, 20)
@@ -0,0 +1,13 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_result_cache_does_not_load_the_scoring_pipeline(tmp_path):
+    code = ("import sys, evaluation.cache; "
+            "sys.exit('evaluation.pipeline' in sys.modules or 'evaluation.analyzers' in sys.modules)")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          env={"SMARTSCRIBE_DB_PATH": str(tmp_path / "smartscribe.db")})
+    assert proc.returncode == 0, proc.stderr
@@ -0,0 +1,45 @@
+def _queue(db, n=1):
+    user_id = db.create_user("ada", "ada@example.com", "x")
+    return user_id, [db.enqueue_evaluation(user_id, f"Essay {i}", "Some essay text.") for i in range(n)]
+
+
+def test_claim_returns_claimed_state_oldest_first(fresh_db):
+    db = fresh_db
+    _, job_ids = _queue(db, 3)
+    claimed = db.claim_jobs("w1", limit=2)
+    assert [j["id"] for j in claimed] == job_ids[:2]
+    assert all(j["status"] == "running" and j["worker"] == "w1" and j["attempts"] == 1 for j in claimed)
+    assert [j["id"] for j in db.claim_jobs("w2", limit=5)] == job_ids[2:]
+    assert db.claim_jobs("w3") == []
+
+
+def test_failed_job_is_retried_until_max_attempts(fresh_db):
+    db = fresh_db
+    _, (job_id,) = _queue(db)
+    for attempt in range(1, db.JOB_MAX_ATTEMPTS + 1):
+        (job,) = db.claim_jobs("w1")
+        assert job["attempts"] == attempt
+        db.fail_job(job_id, "boom")
+        expected = "queued" if attempt < db.JOB_MAX_ATTEMPTS else "failed"
+        assert db.get_job(job_id)["status"] == expected
+    assert db.claim_jobs("w1") == []
+    assert db.get_job(job_id)["error"] == "boom"
+
+
+def test_rejected_job_fails_without_retry(fresh_db):
+    db = fresh_db
+    _, (job_id,) = _queue(db)
+    db.claim_jobs("w1")
+    db.fail_job(job_id, "no words", retry=False)
+    assert db.get_job(job_id)["status"] == "failed"
+
+
+def test_complete_job_saves_the_essay(fresh_db):
+    db = fresh_db
+    user_id, (job_id,) = _queue(db)
+    db.claim_jobs("w1")
+    result = {"scores": {"grammar": 7, "coherence": 6, "argument": 5}, "overall": 6.0, "feedback": "ok"}
+    essay_id = db.complete_job(job_id, result)
+    job = db.get_job(job_id, user_id)
+    assert job["status"] == "done" and job["essay_id"] == essay_id and job["result"] == result
+    assert db.get_essay_count(user_id) == 1
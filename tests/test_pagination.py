@@ -0,0 +1,34 @@
+import pytest
+
+
+def _user_with_essays(db, n):
+    user_id = db.create_user("ada", "ada@example.com", "x")
+    # One transaction, so every essay shares a submitted_at – only ids break the ties
+    db.save_essays_bulk([(user_id, f"Essay {i}", f"Body {i}.", 5, 5, 5, 5, "") for i in range(n)])
+    return user_id
+
+
+def _all_pages(db, user_id, limit):
+    pages, cursor = [], None
+    while True:
+        rows, cursor = db.list_user_essays(user_id, limit=limit, cursor=cursor)
+        pages.append([r["title"] for r in rows])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("n, limit, sizes", [(5, 2, [2, 2, 1]), (4, 2, [2, 2]), (1, 3, [1]), (0, 3, [0])])
+def test_pages_cover_every_essay_once(fresh_db, n, limit, sizes):
+    user_id = _user_with_essays(fresh_db, n)
+    pages = _all_pages(fresh_db, user_id, limit)
+    assert [len(p) for p in pages] == sizes         # no trailing empty page
+    assert [t for p in pages for t in p] == [f"Essay {i}" for i in reversed(range(n))]
+
+
+def test_newer_timestamp_sorts_before_higher_id(fresh_db):
+    db = fresh_db
+    user_id = _user_with_essays(db, 3)
+    with db.transaction(immediate=True) as conn:
+        conn.execute("UPDATE essays SET submitted_at = datetime(submitted_at, '+1 day') WHERE title = 'Essay 0'")
+    db.invalidate_user(user_id)
+    assert _all_pages(db, user_id, 2) == [["Essay 0", "Essay 2"], ["Essay 1"]]
@@ -0,0 +1,22 @@
+import sqlite3
+
+from database import querylog
+
+
+def test_slow_cte_is_logged_with_its_plan():
+    enabled, threshold = querylog.ENABLED, querylog.SLOW_QUERY_MS
+    querylog.reset()
+    querylog.configure(threshold_ms=0)          # every statement counts as slow
+    conn = sqlite3.connect(":memory:", factory=querylog.TimedConnection)
+    try:
+        sqlite3.Connection.execute(conn, "CREATE TABLE essays (id INTEGER PRIMARY KEY, user_id INTEGER)")
+        conn.execute(
+            "WITH mine AS (SELECT id FROM essays WHERE user_id = ?) SELECT COUNT(*) FROM mine", (1,)
+        ).fetchall()
+    finally:
+        conn.close()
+        querylog.configure(threshold, enabled)
+
+    entry = next(e for e in querylog.recent_slow() if e["sql"].startswith("WITH"))
+    assert entry["plan"]
+    assert entry["full_scans"] == ["essays"]
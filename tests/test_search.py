@@ -0,0 +1,62 @@
+import sqlite3
+
+from database.blobs import encode_body, register_sql_functions
+from database.db import _insert_essay
+from database.migrations import migrate
+
+
+def _matches(conn, user_id, term):
+    # Joined with `essays`, as search_essays does, so deleted essays drop out
+    return [row[0] for row in conn.execute(
+        """SELECT s.rowid FROM essay_search s JOIN essays e ON e.id = s.rowid
+           WHERE essay_search MATCH ? ORDER BY s.rowid""",
+        (f'owner : "u{user_id}" AND {{title content feedback}} : {term}',),
+    )]
+
+
+def test_bare_connection_can_write_essays(tmp_path):
+    path = tmp_path / "smartscribe.db"
+    app = sqlite3.connect(path, isolation_level=None)
+    app.execute("PRAGMA foreign_keys = ON")
+    register_sql_functions(app)
+    migrate(app)
+    user_id = app.execute(
+        "INSERT INTO users (username, email, password) VALUES ('ada', 'ada@example.com', 'x')"
+    ).lastrowid
+    stored = _insert_essay(app, user_id, "Blob essay", "Compressed photosynthesis notes",
+                           encode_body("Compressed photosynthesis notes"), (0, 0, 0, 0), "", None, None)
+
+    # No essay_body() here, as in the sqlite3 shell or a backup script
+    bare = sqlite3.connect(path)
+    inline = bare.execute(
+        "INSERT INTO essays (user_id, title, content) VALUES (?, 'Inline essay', 'Glaciers retreat')",
+        (user_id,),
+    ).lastrowid
+    bare.commit()
+    assert _matches(bare, user_id, "glaciers") == [inline]
+    assert _matches(bare, user_id, "photosynthesis") == [stored]
+
+    bare.execute("UPDATE essays SET title = 'Ice sheets' WHERE id = ?", (inline,))
+    bare.execute("DELETE FROM essays WHERE id = ?", (stored,))
+    bare.commit()
+    assert _matches(bare, user_id, "photosynthesis") == []
+    bare.close()
+    app.close()
+
+
+def test_search_marks_hits_in_compressed_bodies(fresh_db):
+    db = fresh_db
+    user_id = db.create_user("ada", "ada@example.com", "x")
+    body = "Rivers carve canyons over millennia. " * 20      # long enough to be stored compressed
+    db.save_essay(user_id, "Canyons", body, feedback="Vivid imagery.")
+    db.save_essay(user_id, "Deserts", "Dunes migrate with the wind.")
+
+    rows, next_offset = db.search_essays(user_id, "canyon")
+    assert next_offset is None
+    assert [r["title"] for r in rows] == ["Canyons"]
+    assert rows[0]["title_html"] == "<mark>Canyons</mark>"
+    assert "<mark>canyons</mark>" in rows[0]["snippet_html"]
+    assert "content" not in rows[0] and "body" not in rows[0]
+
+    other = db.create_user("bob", "bob@example.com", "x")
+    assert db.search_essays(other, "canyon") == ([], None)
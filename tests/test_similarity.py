@@ -0,0 +1,27 @@
+from database import db as db_module
+
+ESSAY = ("Renewable energy adoption accelerates as solar panels become cheaper every year. "
+         "Governments subsidise wind farms while utilities modernise their ageing grids. ") * 4
+
+
+def test_own_drafts_do_not_crowd_out_other_users(fresh_db, monkeypatch):
+    db = fresh_db
+    monkeypatch.setattr(db_module, "MAX_SIMILARITY_CANDIDATES", 5)
+    author = db.create_user("ada", "ada@example.com", "x")
+    copier = db.create_user("bob", "bob@example.com", "x")
+    for draft in range(8):                  # more drafts than the candidate cap
+        db.save_essay(author, f"Draft {draft}", ESSAY)
+    copy_id = db.save_essay(copier, "Totally original", ESSAY + "Indeed.")
+
+    matches = db.find_similar_essays(ESSAY, exclude_user_id=author)
+    assert [m["essay_id"] for m in matches] == [copy_id]
+    assert matches[0]["user_id"] == copier
+    assert matches[0]["similarity"] >= db_module.SIMILARITY_THRESHOLD
+
+
+def test_without_exclusion_own_drafts_match(fresh_db):
+    db = fresh_db
+    author = db.create_user("ada", "ada@example.com", "x")
+    first = db.save_essay(author, "Draft", ESSAY)
+    assert [m["essay_id"] for m in db.find_similar_essays(ESSAY)] == [first]
+    assert db.find_similar_essays(ESSAY, exclude_user_id=author) == []
@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def user(fresh_db):
+    user_id = fresh_db.create_user("ada", "ada@example.com", "x")
+    fresh_db.save_essays_bulk([
+        (user_id, "One",   "Body one.",   4, 6, 8, 6, ""),
+        (user_id, "Two",   "Body two.",   6, 8, 4, 6, ""),
+        (user_id, "Three", "Body three.", 8, 4, 6, 9, ""),
+    ])
+    return user_id
+
+
+def _raw(db, sql, *params):
+    # Outside the app's helpers, so only the triggers can keep user_stats right
+    conn = sqlite3.connect(db.DB_PATH)
+    with conn:
+        conn.execute(sql, params)
+    conn.close()
+
+
+def _stats(db, user_id):
+    return db.get_essay_count(user_id), db.get_average_scores(user_id)
+
+
+def test_delete_updates_stats(fresh_db, user):
+    _raw(fresh_db, "DELETE FROM essays WHERE title = 'Three'")
+    count, avg = _stats(fresh_db, user)
+    assert count == 2
+    assert avg == {"avg_grammar": 5.0, "avg_coherence": 7.0, "avg_argument": 6.0, "avg_overall": 6.0}
+    assert fresh_db.rebuild_user_stats() >= 1
+    assert _stats(fresh_db, user) == (count, avg)
+
+
+def test_update_moves_scores(fresh_db, user):
+    _raw(fresh_db, "UPDATE essays SET overall_score = 3 WHERE title = 'Three'")
+    count, avg = _stats(fresh_db, user)
+    assert count == 3 and avg["avg_overall"] == 5.0
+    fresh_db.rebuild_user_stats()
+    assert _stats(fresh_db, user) == (count, avg)
+
+
+def test_deleting_every_essay_clears_averages(fresh_db, user):
+    _raw(fresh_db, "DELETE FROM essays WHERE user_id = ?", user)
+    assert _stats(fresh_db, user) == (0, {"avg_grammar": None, "avg_coherence": None,
+                                          "avg_argument": None, "avg_overall": None})
@@ -0,0 +1,61 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database.writer import GroupCommitWriter
+
+
+def _insert_user(conn, name):
+    return conn.execute(
+        "INSERT INTO users (username, email, password) VALUES (?, ?, 'x')", (name, f"{name}@example.com")
+    ).lastrowid
+
+
+@pytest.fixture
+def writer(fresh_db):
+    w = GroupCommitWriter(fresh_db.transaction)
+    batches = []
+    commit = w._commit
+    w._commit = lambda batch: (batches.append(len(batch)), commit(batch))
+    w.batches = batches
+    yield w
+    w.close()
+
+
+def _hold_writer(writer):
+    """Queue an op that blocks the writer thread until the returned event is set."""
+    release = threading.Event()
+    started = threading.Event()
+
+    def block(conn):
+        started.set()
+        release.wait(5)
+    writer.submit(block)
+    started.wait(5)
+    return release
+
+
+def test_failing_op_does_not_roll_back_its_batch(fresh_db, writer):
+    release = _hold_writer(writer)
+    ok1 = writer.submit(_insert_user, "ada")
+    dup = writer.submit(_insert_user, "ada")            # violates UNIQUE(username)
+    ok2 = writer.submit(_insert_user, "bob")
+    release.set()
+
+    assert ok1.result(5) and ok2.result(5)
+    with pytest.raises(sqlite3.IntegrityError):
+        dup.result(5)
+    assert writer.batches == [1, 3]                     # the three shared one transaction
+    assert fresh_db.get_user_by_username("ada")["id"] == ok1.result()
+    assert fresh_db.get_user_by_username("bob")["id"] == ok2.result()
+
+
+def test_failing_callback_neither_hangs_nor_kills_the_writer(fresh_db, writer):
+    def boom(_):
+        raise RuntimeError("cache unavailable")
+
+    first = writer.submit(_insert_user, "ada", after=boom)
+    assert first.result(5)                              # committed, so still resolved
+    assert writer.submit(_insert_user, "bob").result(5)
+    assert writer._thread.is_alive()
@@ -0,0 +1,44 @@
+"""
+SmartScribe – Debug panel
+Sidebar panel for admins: where this rerun's time went, span by span, and
+the process-wide latency totals. Shown only when tracing is on
+(SMARTSCRIBE_TRACING=1) and the signed-in username is listed in
+SMARTSCRIBE_ADMINS (comma-separated).
+"""
+
+import os
+
+import streamlit as st
+from auth.auth import is_logged_in
+from database import querylog
+from telemetry import tracing
+
+ADMINS = frozenset(name.strip() for name in os.environ.get("SMARTSCRIBE_ADMINS", "").split(",") if name.strip())
+
+
+def is_admin() -> bool:
+    return is_logged_in() and st.session_state.get("username") in ADMINS
+
+
+def render_debug_panel(spans: list):
+    """`spans` is the finished rerun's trace from ``tracing.end_rerun()``."""
+    if not tracing.ENABLED or not is_admin():
+        return
+
+    with st.sidebar.expander("🛠️ Debug · timings"):
+        total = sum(ms for _, depth, _, ms in spans if depth == 0)
+        st.caption(f"This rerun: {total:.1f} ms in traced code across {len(spans)} spans")
+        if spans:
+            st.dataframe(
+                [{"span": "· " * depth + name, "at ms": round(offset, 1), "ms": round(ms, 2)}
+                 for name, depth, offset, ms in spans],
+                hide_index=True, use_container_width=True,
+            )
+
+        st.caption("This process since start")
+        st.dataframe(tracing.summary(), hide_index=True, use_container_width=True)
+        if querylog.ENABLED:
+            st.caption(f"Costliest query shapes (slow ≥ {querylog.SLOW_QUERY_MS:g} ms)")
+            st.dataframe(querylog.top(10), hide_index=True, use_container_width=True)
+        st.download_button("⬇️  Prometheus metrics", tracing.prometheus_text(),
+                           file_name="smartscribe.prom", mime="text/plain", use_container_width=True)
@@ -0,0 +1,153 @@
+"""
+SmartScribe – Evaluate Page
+Essay submission form. Scoring runs on the background worker; the page queues
+a job and a small fragment polls it until the result is ready.
+"""
+
+import logging
+import os
+import time
+
+import streamlit as st
+from auth.auth import is_logged_in
+from database.db import enqueue_evaluation, find_similar_essays, get_job, invalidate_user, save_essay
+from telemetry.tracing import traced
+
+# Set when `python -m evaluation.worker` runs as its own service; otherwise the
+# Streamlit server hosts the worker itself.
+_EXTERNAL_WORKER = os.environ.get("SMARTSCRIBE_EXTERNAL_WORKER", "") == "1"
+# Stop polling a job that hasn't finished by then and tell the user so.
+POLL_TIMEOUT_S = 300
+
+log = logging.getLogger("smartscribe.evaluate")
+
+
+@st.cache_resource
+def _background_worker():
+    from evaluation.worker import start_background_worker
+    return start_background_worker()
+
+
+def _ensure_worker():
+    """Start the embedded worker, or replace it if its thread has died."""
+    if _EXTERNAL_WORKER:
+        return
+    if not _background_worker().is_alive():
+        log.error("evaluation worker thread died; starting a new one")
+        _background_worker.clear()
+        _background_worker()
+
+
+@st.fragment(run_every=0.5)
+def _poll_job(job_id: int):
+    _ensure_worker()
+    job = get_job(job_id, st.session_state["user_id"])
+    started = st.session_state.setdefault("eval_job_started", time.monotonic())
+    if job is not None and job["status"] not in ("done", "failed") and time.monotonic() - started > POLL_TIMEOUT_S:
+        st.session_state["eval_job_id"] = None
+        st.session_state["eval_job"] = {
+            "status": "failed", "result": None,
+            "error": f"no result after {POLL_TIMEOUT_S // 60} minutes. "
+                     "If it finishes later, the essay will appear on your dashboard.",
+        }
+        st.rerun()
+    if job is None or job["status"] in ("done", "failed"):
+        # The essay may have been saved by a worker in another process
+        invalidate_user(st.session_state["user_id"])
+        st.session_state["eval_job_id"] = None
+        st.session_state["eval_job"] = job
+        st.session_state["eval_fresh"] = True   # celebrate once, not on every rerun
+        st.rerun()                      # full rerun drops this polling fragment
+
+    progress = job["progress"]
+    if job["status"] == "queued" or not progress:
+        label = "Waiting for a free evaluator…" if job["status"] == "queued" else "Evaluating your essay…"
+        st.info(f"⏳ {label}")
+        return
+
+    # Long essays stream partial results: paragraph progress, then each
+    # dimension's score as soon as it is known.
+    done, total = progress["steps_done"], max(progress["steps_total"], 1)
+    st.progress(done / total, text=f"Analyzing paragraphs… {done}/{total}")
+    dims = progress["dimensions"]
+    cols = st.columns(3)
+    for col, name in zip(cols, ("grammar", "coherence", "argument")):
+        col.metric(name.title(), f"{dims[name]['score']}/10" if name in dims else "…")
+    for name, dim in dims.items():
+        st.caption(f"**{name.title()}** – " + " ".join(dim["notes"]))
+
+
+def _render_result(job: dict):
+    if job is None:
+        st.error("That evaluation could not be found.")
+        return
+    if job["status"] == "failed":
+        st.error(f"Evaluation failed: {job['error'] or 'unknown error'}")
+        return
+    result = job["result"]
+    scores = result["scores"]
+    st.success(f"Essay submitted! Overall score: **{result['overall']}/10**")
+    mc1, mc2, mc3 = st.columns(3)
+    mc1.metric("Grammar", f"{scores.get('grammar', 0)}/10")
+    mc2.metric("Coherence", f"{scores.get('coherence', 0)}/10")
+    mc3.metric("Argument", f"{scores.get('argument', 0)}/10")
+    st.info(result["feedback"])
+
+
+@traced("view.evaluate")
+def render_evaluate_page():
+    st.markdown("## 📝 Essay Evaluation")
+    if not is_logged_in():
+        st.warning("Please sign in to submit an essay.")
+        if st.button("🔑 Go to Login", key="eval_goto_login"):
+            st.session_state["current_page"] = "login"
+            st.rerun()
+        return
+
+    _ensure_worker()
+
+    with st.form("essay_placeholder"):
+        title = st.text_input("Essay Title", placeholder="e.g. The Impact of AI on Education")
+        content = st.text_area("Essay Content", height=250, placeholder="Paste or type your essay here…")
+        submitted = st.form_submit_button("🔍  Evaluate", use_container_width=True)
+        if submitted:
+            if not title.strip() or not content.strip():
+                st.error("Please provide both a title and essay content.")
+            else:
+                # Checked before saving, so the essay never matches itself
+                st.session_state["eval_similar"] = find_similar_essays(
+                    content.strip(), exclude_user_id=st.session_state["user_id"]
+                )
+                from evaluation import cache
+                cached = cache.lookup(content.strip())
+                if cached is not None:
+                    # Seen this exact essay before – save it without queuing a job
+                    save_essay(
+                        st.session_state["user_id"], title.strip(), content.strip(),
+                        cached["scores"].get("grammar", 0), cached["scores"].get("coherence", 0),
+                        cached["scores"].get("argument", 0), cached["overall"], cached["feedback"],
+                        paragraphs=cached.get("paragraphs"),
+                    )
+                    st.session_state["eval_job_id"] = None
+                    st.session_state["eval_job"] = {"status": "done", "result": cached, "error": ""}
+                    st.session_state["eval_fresh"] = True
+                else:
+                    st.session_state["eval_job_id"] = enqueue_evaluation(
+                        st.session_state["user_id"], title.strip(), content.strip()
+                    )
+                    st.session_state["eval_job_started"] = time.monotonic()
+                    st.session_state["eval_job"] = None
+
+    similar = st.session_state.get("eval_similar")
+    if similar:
+        st.warning(
+            f"⚠️ This essay is {similar[0]['similarity']:.0%} similar to "
+            f"{len(similar)} essay{'s' if len(similar) > 1 else ''} submitted by other users."
+        )
+
+    if st.session_state.get("eval_job_id"):
+        _poll_job(st.session_state["eval_job_id"])
+    elif st.session_state.get("eval_job") is not None:
+        _render_result(st.session_state["eval_job"])
+        if st.session_state.pop("eval_fresh", False) and st.session_state["eval_job"]["status"] == "done":
+            st.balloons()
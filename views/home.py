@@ -5,123 +5,11 @@ Renders the landing / dashboard page depending on auth state.
 
 import streamlit as st
 from auth.auth import is_logged_in
-
-
-# ─── CSS shared by both views ───────────────────────────────────────────────────
-_COMMON_CSS = """
-<style>
-/* ── Hero ────────────────────────── */
-.hero {
-    text-align: center;
-    padding: 3rem 1rem 2rem;
-}
-.hero h1 {
-    font-size: 2.8rem;
-    font-weight: 800;
-    background: linear-gradient(135deg, #4F46E5, #7C3AED);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    margin-bottom: 0.5rem;
-}
-.hero .tagline {
-    font-size: 1.15rem;
-    color: #64748b;
-    max-width: 600px;
-    margin: 0 auto 2rem;
-    line-height: 1.6;
-}
-
-/* ── Feature cards ───────────────── */
-.feature-card {
-    background: #ffffff;
-    border: 1px solid #e2e8f0;
-    border-radius: 14px;
-    padding: 1.6rem;
-    text-align: center;
-    transition: transform 0.2s, box-shadow 0.2s;
-    height: 100%;
-}
-.feature-card:hover {
-    transform: translateY(-4px);
-    box-shadow: 0 8px 28px rgba(79,70,229,0.10);
-}
-.feature-icon {
-    font-size: 2.2rem;
-    margin-bottom: 0.6rem;
-}
-.feature-card h3 {
-    font-size: 1.05rem;
-    color: #1e293b;
-    margin-bottom: 0.4rem;
-}
-.feature-card p {
-    font-size: 0.88rem;
-    color: #64748b;
-    line-height: 1.5;
-}
-
-/* ── How-it-works steps ──────────── */
-.step-badge {
-    display: inline-block;
-    width: 36px; height: 36px;
-    line-height: 36px;
-    border-radius: 50%;
-    background: #4F46E5;
-    color: #fff;
-    font-weight: 700;
-    font-size: 1rem;
-    text-align: center;
-    margin-bottom: 0.5rem;
-}
-.step-title {
-    font-weight: 600;
-    font-size: 1rem;
-    color: #1e293b;
-}
-.step-desc {
-    font-size: 0.88rem;
-    color: #64748b;
-}
-
-/* ── Stats row ───────────────────── */
-.stat-card {
-    background: linear-gradient(135deg, #4F46E5 0%, #7C3AED 100%);
-    border-radius: 14px;
-    padding: 1.4rem;
-    text-align: center;
-    color: #fff;
-}
-.stat-card .num {
-    font-size: 1.8rem;
-    font-weight: 800;
-}
-.stat-card .label {
-    font-size: 0.85rem;
-    opacity: 0.85;
-}
-
-/* section header */
-.section-header {
-    text-align: center;
-    font-size: 1.5rem;
-    font-weight: 700;
-    color: #1e293b;
-    margin: 2.5rem 0 1rem;
-}
-.section-sub {
-    text-align: center;
-    color: #64748b;
-    font-size: 0.95rem;
-    margin-bottom: 1.5rem;
-}
-</style>
-"""
+from telemetry.tracing import traced
 
 
 # ─── Landing page (unauthenticated) ─────────────────────────────────────────────
 def _render_landing():
-    st.markdown(_COMMON_CSS, unsafe_allow_html=True)
-
     # Hero
     st.markdown("""
     <div class="hero">
@@ -214,9 +102,7 @@ def _render_landing():
 
 # ─── Dashboard page (authenticated) ─────────────────────────────────────────────
 def _render_dashboard():
-    from database.db import get_essay_count, get_average_scores, get_user_essays
-
-    st.markdown(_COMMON_CSS, unsafe_allow_html=True)
+    from database.db import get_dashboard_snapshot, get_essay_content
 
     user_id = st.session_state["user_id"]
     name = st.session_state.get("full_name") or st.session_state.get("username", "User")
@@ -242,8 +128,9 @@ def _render_dashboard():
                 st.rerun()
 
     # Stat cards
-    essay_count = get_essay_count(user_id)
-    avg = get_average_scores(user_id)
+    snapshot = get_dashboard_snapshot(user_id, recent=5)
+    essay_count = snapshot["essay_count"]
+    avg = snapshot["averages"]
     avg_overall   = avg.get("avg_overall", 0) or 0
     avg_grammar   = avg.get("avg_grammar", 0) or 0
     avg_coherence = avg.get("avg_coherence", 0) or 0
@@ -264,7 +151,7 @@ def _render_dashboard():
 
     # Recent submissions
     st.markdown('<p class="section-header">📄 Recent Submissions</p>', unsafe_allow_html=True)
-    essays = get_user_essays(user_id, limit=5)
+    essays = snapshot["recent_essays"]
     if essays:
         for e in essays:
             with st.expander(f"**{e['title']}**  ·  Overall: {e['overall_score']}/10  ·  {e['submitted_at'][:10]}"):
@@ -272,14 +159,18 @@ def _render_dashboard():
                 mc1.metric("Grammar", f"{e['grammar_score']}/10")
                 mc2.metric("Coherence", f"{e['coherence_score']}/10")
                 mc3.metric("Argument", f"{e['argument_score']}/10")
-                if e["feedback"]:
-                    st.info(e["feedback"])
-                st.text_area("Essay Text", e["content"], height=120, disabled=True, key=f"essay_{e['id']}")
+                # Body and feedback are only fetched when asked for
+                if st.toggle("Show feedback & essay text", key=f"dash_show_{e['id']}"):
+                    details = get_essay_content(e["id"], user_id) or {}
+                    if details.get("feedback"):
+                        st.info(details["feedback"])
+                    st.text_area("Essay Text", details.get("content", ""), height=120, disabled=True, key=f"essay_{e['id']}")
     else:
         st.info("No essays yet. Submit your first essay to get started! 🚀")
 
 
 # ─── Public entry point ─────────────────────────────────────────────────────────
+@traced("view.home")
 def render_home_page():
     if is_logged_in():
         _render_dashboard()
@@ -3,55 +3,91 @@ SmartScribe – Profile Page
 Shows user info, editable fields, submission history & progress charts.
 """
 
+from datetime import datetime, timedelta, timezone
+
 import streamlit as st
 from auth.auth import is_logged_in, hash_password, verify_password
 from database.db import (
-    get_user_by_id,
+    get_dashboard_snapshot,
+    get_essay_content,
+    get_score_series,
+    list_user_essays,
+    search_essays,
     update_user,
-    get_essay_count,
-    get_average_scores,
-    get_user_essays,
 )
+from telemetry.tracing import traced
 
-_CSS = """
-<style>
-.profile-header {
-    text-align: center;
-    padding: 2rem 1rem 1rem;
-}
-.profile-header .avatar {
-    width: 100px; height: 100px;
-    border-radius: 50%;
-    background: linear-gradient(135deg,#4F46E5,#7C3AED);
-    color: #fff;
-    font-size: 2.5rem;
-    line-height: 100px;
-    margin: 0 auto 0.75rem;
-    font-weight: 700;
-}
-.profile-header h2 {
-    margin: 0; font-weight: 700; color: #1e293b;
-}
-.profile-header p {
-    color: #64748b; font-size: 0.92rem;
-}
-.profile-stat {
-    background: #f8fafc;
-    border: 1px solid #e2e8f0;
-    border-radius: 12px;
-    padding: 1.2rem;
-    text-align: center;
-}
-.profile-stat .num {
-    font-size: 1.6rem; font-weight: 800; color: #4F46E5;
-}
-.profile-stat .lbl {
-    font-size: 0.82rem; color: #64748b;
-}
-</style>
-"""
+_HISTORY_PAGE_SIZE = 20
+_SEARCH_PAGE_SIZE = 10
+_CHART_BUCKETS = {"Day": "day", "Week": "week", "Month": "month"}
+_CHART_RANGES = {"Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+
+
+def _graph_objects():
+    """plotly.graph_objects, imported only when a chart is actually drawn."""
+    import plotly.graph_objects as go
+
+    return go
+
+
+def _load_more_history(user_id: int):
+    """Button callback: append the next page of summaries to the session."""
+    rows, cursor = list_user_essays(user_id, limit=_HISTORY_PAGE_SIZE, cursor=st.session_state["history_cursor"])
+    st.session_state["history_extra"].extend(rows)
+    st.session_state["history_cursor"] = cursor
+
+
+def _load_more_results(user_id: int):
+    """Button callback: append the next page of search hits to the session."""
+    rows, offset = search_essays(user_id, st.session_state["history_search"],
+                                 limit=_SEARCH_PAGE_SIZE, offset=st.session_state["search_offset"])
+    st.session_state["search_extra"].extend(rows)
+    st.session_state["search_offset"] = offset
+
+
+def _essay_details(e: dict, user_id: int, key: str):
+    """Scores plus an on-demand toggle for the essay's feedback and text."""
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Grammar",   f"{e['grammar_score']}/10")
+    c2.metric("Coherence", f"{e['coherence_score']}/10")
+    c3.metric("Argument",  f"{e['argument_score']}/10")
+    if st.toggle("Show feedback & essay text", key=f"{key}_show_{e['id']}"):
+        details = get_essay_content(e["id"], user_id) or {}
+        if details.get("feedback"):
+            st.info(details["feedback"])
+        st.text_area("Essay Text", details.get("content", ""), height=160,
+                     disabled=True, key=f"{key}_essay_{e['id']}")
 
 
+def _render_search(user_id: int, query: str):
+    rows, offset = search_essays(user_id, query, limit=_SEARCH_PAGE_SIZE)
+    anchor = (user_id, query, offset)
+    if st.session_state.get("search_anchor") != anchor:
+        st.session_state["search_anchor"] = anchor
+        st.session_state["search_offset"] = offset
+        st.session_state["search_extra"] = []
+
+    hits = rows + st.session_state["search_extra"]
+    if not hits:
+        st.info("No essays match your search.")
+        return
+    for e in hits:
+        st.markdown(f"""
+        <div class="search-hit">
+            <div class="title">{e['title_html']}</div>
+            <div class="meta">Overall {e['overall_score']}/10  ·  {e['submitted_at'][:10]}</div>
+            <div class="snippet">{e['snippet_html']}</div>
+        </div>
+        """, unsafe_allow_html=True)
+        with st.expander("Scores & essay"):
+            _essay_details(e, user_id, "search")
+
+    if st.session_state["search_offset"] is not None:
+        st.button("⬇️  More results", use_container_width=True, key="search_load_more",
+                  on_click=_load_more_results, args=(user_id,))
+
+
+@traced("view.profile")
 def render_profile_page():
     if not is_logged_in():
         st.warning("Please sign in to view your profile.")
@@ -60,10 +96,9 @@ def render_profile_page():
             st.rerun()
         return
 
-    st.markdown(_CSS, unsafe_allow_html=True)
-
     user_id = st.session_state["user_id"]
-    user = get_user_by_id(user_id)
+    snapshot = get_dashboard_snapshot(user_id, recent=_HISTORY_PAGE_SIZE)
+    user = snapshot["user"]
     if not user:
         st.error("User not found.")
         return
@@ -81,8 +116,8 @@ def render_profile_page():
     """, unsafe_allow_html=True)
 
     # ── Stats row ────────────────────────────────────────────────────────────────
-    essay_count = get_essay_count(user_id)
-    avg = get_average_scores(user_id)
+    essay_count = snapshot["essay_count"]
+    avg = snapshot["averages"]
     avg_overall  = avg.get("avg_overall", 0) or 0
     avg_grammar  = avg.get("avg_grammar", 0) or 0
     avg_argument = avg.get("avg_argument", 0) or 0
@@ -156,44 +191,69 @@ def render_profile_page():
 
     # ── Submission History ───────────────────────────────────────────────────────
     with tab_history:
-        essays = get_user_essays(user_id, limit=20)
+        essays = snapshot["recent_essays"]
         if not essays:
             st.info("You haven't submitted any essays yet. Start writing! 📝")
         else:
-            # Score-over-time chart
+            # Score-over-time chart – aggregated and downsampled in the DB layer,
+            # so its size doesn't grow with the history.
+            c_bucket, c_range = st.columns(2)
+            bucket = c_bucket.selectbox("Group by", list(_CHART_BUCKETS), index=1, key="history_bucket")
+            span = c_range.selectbox("Range", list(_CHART_RANGES), index=len(_CHART_RANGES) - 1,
+                                     key="history_range")
+            days = _CHART_RANGES[span]
+            since = (datetime.now(timezone.utc).date() - timedelta(days=days)).isoformat() if days else None
+            series = get_score_series(user_id, _CHART_BUCKETS[bucket], since=since)
+            points = series["points"]
             try:
-                import plotly.graph_objects as go
-
-                dates   = [e["submitted_at"][:10] for e in reversed(essays)]
-                overall = [e["overall_score"] for e in reversed(essays)]
-                grammar = [e["grammar_score"] for e in reversed(essays)]
-                coh     = [e["coherence_score"] for e in reversed(essays)]
+                go = _graph_objects()
 
+                dates = [p["bucket"] for p in points]
                 fig = go.Figure()
-                fig.add_trace(go.Scatter(x=dates, y=overall, mode="lines+markers", name="Overall"))
-                fig.add_trace(go.Scatter(x=dates, y=grammar, mode="lines+markers", name="Grammar"))
-                fig.add_trace(go.Scatter(x=dates, y=coh,     mode="lines+markers", name="Coherence"))
+                for name, field in (("Overall", "overall"), ("Grammar", "grammar"), ("Coherence", "coherence")):
+                    fig.add_trace(go.Scatter(
+                        x=dates, y=[p[field] for p in points], mode="lines+markers", name=name,
+                        customdata=[p["essays"] for p in points],
+                        hovertemplate="%{y:.1f} avg over %{customdata} essay(s)",
+                    ))
                 fig.update_layout(
                     title="Score Progress Over Time",
-                    xaxis_title="Date",
+                    xaxis_title=bucket,
                     yaxis_title="Score (out of 10)",
                     yaxis=dict(range=[0, 10.5]),
                     template="plotly_white",
                     height=350,
                     margin=dict(t=40, b=30),
+                    hovermode="x unified",
                 )
                 st.plotly_chart(fig, use_container_width=True)
+                caption = f"{series['essays']} essays in {series['buckets']} {bucket.lower()} buckets"
+                if len(points) < series["buckets"]:
+                    caption += f" · showing {len(points)} representative points"
+                st.caption(caption)
             except ImportError:
                 st.caption("Install `plotly` for score-progress charts.")
 
-            # Table
-            for e in essays:
+            query = st.text_input("🔎 Search your essays", key="history_search",
+                                  placeholder="Words from a title, the essay or its feedback").strip()
+            if query:
+                _render_search(user_id, query)
+                return
+
+            # Table – first page comes from the snapshot, later pages are
+            # appended by "Load more". Reset when the first page moves on.
+            anchor = (user_id, snapshot["next_cursor"])
+            if st.session_state.get("history_anchor") != anchor:
+                st.session_state["history_anchor"] = anchor
+                st.session_state["history_cursor"] = snapshot["next_cursor"]
+                st.session_state["history_extra"] = []
+
+            for e in essays + st.session_state["history_extra"]:
                 with st.expander(
                     f"**{e['title']}**  ·  Overall {e['overall_score']}/10  ·  {e['submitted_at'][:10]}"
                 ):
-                    c1, c2, c3 = st.columns(3)
-                    c1.metric("Grammar",   f"{e['grammar_score']}/10")
-                    c2.metric("Coherence", f"{e['coherence_score']}/10")
-                    c3.metric("Argument",  f"{e['argument_score']}/10")
-                    if e["feedback"]:
-                        st.info(e["feedback"])
+                    _essay_details(e, user_id, "hist")
+
+            if st.session_state["history_cursor"] is not None:
+                st.button("⬇️  Load more", use_container_width=True, key="history_load_more",
+                          on_click=_load_more_history, args=(user_id,))
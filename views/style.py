@@ -0,0 +1,57 @@
+"""
+SmartScribe – Stylesheet loader
+All app CSS lives in static/smartscribe.css, which Streamlit serves at
+app/static/ (server.enableStaticServing). Every run emits the same tiny
+component: if the page has no <style> for the current version yet, it fetches
+the file and installs it in the page <head>, where it stays for the rest of
+the session. Because the check happens in the browser, a run that was
+superseded before its component loaded simply leaves the job to the next.
+
+(The file is fetched and applied as text: Streamlit serves .css as
+text/plain, which browsers refuse in a <link rel="stylesheet">.)
+"""
+
+import hashlib
+import os
+import re
+
+import streamlit.components.v1 as components
+
+_CSS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", "smartscribe.css")
+
+with open(_CSS_PATH, encoding="utf-8") as _fh:
+    STYLESHEET = _fh.read()
+STYLESHEET_VERSION = hashlib.sha256(STYLESHEET.encode()).hexdigest()[:12]
+
+
+# Runs inside the component's same-origin iframe; the <style> it adds to the
+# parent document outlives the iframe. Identical on every run, so Streamlit
+# keeps the mounted iframe instead of reloading it.
+_LOADER = """<script>
+(function () {
+  const box = window.frameElement && window.frameElement.closest(
+    '[data-testid="stElementContainer"], .element-container');
+  if (box) box.style.display = "none";
+  const doc = window.parent.document;
+  const id = "smartscribe-css-%(version)s";
+  if (doc.getElementById(id)) return;
+  fetch(new URL("app/static/smartscribe.css?v=%(version)s", window.parent.location.href))
+    .then((resp) => resp.ok ? resp.text() : Promise.reject(resp.status))
+    .then((css) => {
+      if (doc.getElementById(id)) return;
+      doc.querySelectorAll('style[id^="smartscribe-css-"]').forEach((el) => el.remove());
+      const style = doc.createElement("style");
+      style.id = id;
+      style.textContent = css;
+      doc.head.appendChild(style);
+    });
+})();
+</script>"""
+
+
+_LOADER_HTML = re.sub(r"\s*\n\s*", "", _LOADER % {"version": STYLESHEET_VERSION})
+
+
+def inject_stylesheet():
+    """Make sure the page has the current stylesheet; a few hundred bytes per run."""
+    components.html(_LOADER_HTML, height=0)